@@ -1,8 +1,25 @@
+import io
 import re
 import os
+import mmap
+import threading
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Set, Dict
-from collections import defaultdict
+from typing import IO, Callable, Iterable, List, Optional, Set, Dict, Tuple, Union
+from collections import namedtuple
+
+# Hunk header: @@ -old_start,old_count +new_start,new_count @@
+_HUNK_RE = re.compile(r'@@ -(\d+),?(\d*) \+(\d+),?(\d*) @@')
+
+# Line prefixes that open a new section of a git diff
+_DIFF_GIT = 'diff --git'
+_OLD_PATH = '--- '
+_NEW_PATH = '+++ '
+_HUNK_HEADER = '@@'
+
+# First character of hunk content lines (added, removed, context)
+_CONTENT_PREFIXES = frozenset('+- ')
 
 # ==================== LANGUAGE DETECTOR ====================
 
@@ -24,13 +41,26 @@ class LanguageDetector:
     
     @staticmethod
     def detect(filepath):
+        return detect_language(filepath)
+
+
+def detect_language(filepath):
+    """Language of a '/'-separated path from its extension, or None"""
+    dot = filepath.rfind('.')
+    sep = filepath.rfind('/')
+    if dot <= sep + 1:
+        # No extension, or a dotfile such as '.c'
+        return None
+    if filepath[sep + 1] == '.':
+        # Leading dots of a name never start an extension; let splitext decide
         _, ext = os.path.splitext(filepath)
         return LanguageDetector.LANGUAGE_MAP.get(ext.lower())
+    return LanguageDetector.LANGUAGE_MAP.get(filepath[dot:].lower())
 
 
 # ==================== DIFF DATA STRUCTURES ====================
 
-@dataclass
+@dataclass(slots=True)
 class DiffHunk:
     """Represents a single changed section in a file"""
     old_start: int
@@ -39,18 +69,18 @@ class DiffHunk:
     new_count: int
     lines: List[str]
 
-@dataclass
+@dataclass(slots=True)
 class FileDiff:
     """Represents changes to a single file"""
-    old_path: str
-    new_path: str
+    old_path: Optional[str]
+    new_path: Optional[str]
     is_new_file: bool
     is_deleted_file: bool
     is_renamed: bool
     hunks: List[DiffHunk]
-    language: str = None
+    language: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class GitDiff:
     """Represents a complete git diff"""
     files: List[FileDiff]
@@ -62,23 +92,43 @@ class DiffParser:
     """Parse git diff output"""
     
     @staticmethod
-    def parse(diff_text: str) -> GitDiff:
-        """Parse git diff text into structured format"""
-        files = []
-        current_file = None
-        current_hunk = None
-        
-        lines = diff_text.split('\n')
-        i = 0
+    def parse(diff_text: Union[str, IO[str]]) -> GitDiff:
+        """
+        Parse git diff text into structured format
         
-        while i < len(lines):
-            line = lines[i]
+        diff_text: The diff as a string, or a text stream (e.g. an open file
+                   or a subprocess pipe) that is consumed line by line
+        """
+        files: List[FileDiff] = []
+        current_file: Optional[FileDiff] = None
+        current_hunk: Optional[DiffHunk] = None
+        lines: Iterable[str]
+        
+        if isinstance(diff_text, str):
+            # Split on '\n' only: splitlines() would also break on form feeds
+            # and other separators that appear inside source lines
+            lines = diff_text.split('\n')
+        else:
+            lines = (line.rstrip('\n') for line in diff_text)
+        
+        # Bound appends of the open file/hunk, rebound whenever those change
+        file_hunks_append: Optional[Callable[[DiffHunk], None]] = None
+        hunk_append: Optional[Callable[[str], None]] = None
+        
+        for line in lines:
+            head = line[:4]
+            
+            # Changed lines: by far the most common case, so test them before
+            # the header ladder ('--- '/'+++ ' still count as path headers)
+            if (hunk_append is not None and line[:1] in _CONTENT_PREFIXES
+                    and head != _OLD_PATH and head != _NEW_PATH):
+                hunk_append(line)
             
             # New file diff starts with "diff --git"
-            if line.startswith('diff --git'):
+            elif line[:10] == _DIFF_GIT:
                 # Save previous file
-                if current_file and current_hunk:
-                    current_file.hunks.append(current_hunk)
+                if current_hunk is not None and file_hunks_append is not None:
+                    file_hunks_append(current_hunk)
                 if current_file:
                     files.append(current_file)
                 
@@ -91,62 +141,57 @@ class DiffParser:
                     is_renamed=False,
                     hunks=[]
                 )
+                file_hunks_append = current_file.hunks.append
                 current_hunk = None
+                hunk_append = None
             
             # Old file path
-            elif line.startswith('--- '):
+            elif head == _OLD_PATH:
                 if current_file:
                     path = line[4:].strip()
                     if path.startswith('a/'):
                         path = path[2:]
                     if path == '/dev/null':
                         current_file.is_new_file = True
-                        path = None
-                    current_file.old_path = path
+                        current_file.old_path = None
+                    else:
+                        current_file.old_path = path
             
             # New file path
-            elif line.startswith('+++ '):
+            elif head == _NEW_PATH:
                 if current_file:
                     path = line[4:].strip()
                     if path.startswith('b/'):
                         path = path[2:]
                     if path == '/dev/null':
                         current_file.is_deleted_file = True
-                        path = None
-                    current_file.new_path = path
-                    
-                    # Detect language
-                    if path:
-                        current_file.language = LanguageDetector.detect(path)
+                        current_file.new_path = None
+                    else:
+                        current_file.new_path = path
+                        
+                        # Detect language
+                        if path:
+                            current_file.language = detect_language(path)
             
             # Hunk header: @@ -old_start,old_count +new_start,new_count @@
-            elif line.startswith('@@'):
+            elif line[:2] == _HUNK_HEADER:
                 # Save previous hunk
-                if current_hunk and current_file:
-                    current_file.hunks.append(current_hunk)
+                if current_hunk is not None and file_hunks_append is not None:
+                    file_hunks_append(current_hunk)
                 
                 # Parse hunk header
-                match = re.match(r'@@ -(\d+),?(\d*) \+(\d+),?(\d*) @@', line)
+                match = _HUNK_RE.match(line)
                 if match:
-                    old_start = int(match.group(1))
-                    old_count = int(match.group(2)) if match.group(2) else 1
-                    new_start = int(match.group(3))
-                    new_count = int(match.group(4)) if match.group(4) else 1
+                    old_start, old_count, new_start, new_count = match.groups()
                     
                     current_hunk = DiffHunk(
-                        old_start=old_start,
-                        old_count=old_count,
-                        new_start=new_start,
-                        new_count=new_count,
+                        old_start=int(old_start),
+                        old_count=int(old_count) if old_count else 1,
+                        new_start=int(new_start),
+                        new_count=int(new_count) if new_count else 1,
                         lines=[]
                     )
-            
-            # Changed lines
-            elif current_hunk is not None:
-                if line.startswith(('+', '-', ' ')):
-                    current_hunk.lines.append(line)
-            
-            i += 1
+                    hunk_append = current_hunk.lines.append
         
         # Save last file and hunk
         if current_file and current_hunk:
@@ -159,14 +204,23 @@ class DiffParser:
 
 # ==================== CHANGED FUNCTION ====================
 
+def function_full_path(filepath: str, function_name: str, parent_class: Optional[str] = None) -> str:
+    """Graph key of a function: filepath::Class.function or filepath::function"""
+    if parent_class:
+        return f"{filepath}::{parent_class}.{function_name}"
+    return f"{filepath}::{function_name}"
+
+
 class ChangedFunction:
     """Represents a function that was modified in the diff"""
-    def __init__(self, filepath, function_name, parent_class=None):
+    __slots__ = ('filepath', 'function_name', 'parent_class', 'qualified_name', 'full_path')
+    
+    def __init__(self, filepath: str, function_name: str, parent_class: Optional[str] = None):
         self.filepath = filepath
         self.function_name = function_name
         self.parent_class = parent_class
         self.qualified_name = f"{parent_class}.{function_name}" if parent_class else function_name
-        self.full_path = f"{filepath}::{parent_class}.{function_name}" if parent_class else f"{filepath}::{function_name}"
+        self.full_path = function_full_path(filepath, function_name, parent_class)
     
     def __repr__(self):
         return self.full_path
@@ -182,48 +236,114 @@ class DiffAnalyzer:
         scanner: Your MultiLanguageScanner instance
         """
         self.scanner = scanner
+        
+        # Start/end line arrays per file, for the fns_by_file dict they were
+        # computed from (the scanner replaces that dict on every scan)
+        self._bounds: Dict[str, Tuple[List[int], List[int]]] = {}
+        self._bounds_index: Optional[Dict[str, List]] = None
+        
+        # Index built here for scanners without fns_by_file, with the
+        # (id, len) of the nodes list it was built from
+        self._own_index: Dict[str, List] = {}
+        self._own_index_key: Optional[Tuple[int, int]] = None
+    
+    def _functions_by_file(self) -> Dict[str, List]:
+        """Per-file functions sorted by start line, as the scanner has them now"""
+        fns_by_file: Optional[Dict[str, List]] = getattr(self.scanner, 'fns_by_file', None)
+        if not fns_by_file:
+            # Scanner without a prebuilt index (or filled via scan_file only)
+            fns_by_file = self._index_nodes(self.scanner.nodes)
+        
+        if fns_by_file is not self._bounds_index:
+            self._bounds = {}
+            self._bounds_index = fns_by_file
+        return fns_by_file
+    
+    def _index_nodes(self, nodes: List) -> Dict[str, List]:
+        """Functions of nodes grouped by file, rebuilt only when nodes is replaced or resized"""
+        key = (id(nodes), len(nodes))
+        if key != self._own_index_key:
+            index: Dict[str, List] = {}
+            for node in nodes:
+                if node.node_type in ('function', 'method'):
+                    index.setdefault(node.filepath, []).append(node)
+            for file_nodes in index.values():
+                file_nodes.sort(key=lambda n: n.start_line)
+            self._own_index = index
+            self._own_index_key = key
+        return self._own_index
+    
+    def _file_bounds(self, fns_by_file: Dict[str, List], filepath: str) -> Tuple[List[int], List[int]]:
+        """Start and end lines of the functions in filepath"""
+        bounds = self._bounds.get(filepath)
+        if bounds is None:
+            nodes = fns_by_file[filepath]
+            bounds = ([n.start_line for n in nodes], [n.end_line for n in nodes])
+            self._bounds[filepath] = bounds
+        return bounds
+    
+    def invalidate(self):
+        """Forget cached line bounds (call after the scanner's graph changes)"""
+        self._bounds = {}
+        self._bounds_index = None
+        self._own_index_key = None
     
     def find_changed_functions(self, git_diff: GitDiff) -> List[ChangedFunction]:
         """Find which functions were modified in the diff"""
-        changed_functions = []
+        # Overlapping nodes, deduplicated on their graph key; the
+        # ChangedFunction objects are only created once at the end
+        changed_nodes: List = []
+        seen_paths: Set[str] = set()
+        fns_by_file = self._functions_by_file()
         
         for file_diff in git_diff.files:
-            if file_diff.is_deleted_file:
-                continue
-            
             filepath = file_diff.new_path
+            if file_diff.is_deleted_file or filepath is None:
+                continue
             
             # Get all functions in this file from our semantic graph
-            file_nodes = [n for n in self.scanner.nodes 
-                         if n.filepath == filepath and n.node_type in ['function', 'method']]
+            file_nodes = fns_by_file.get(filepath)
+            if not file_nodes:
+                continue
+            starts, ends = self._file_bounds(fns_by_file, filepath)
             
             # For each hunk, find which functions it touches
             for hunk in file_diff.hunks:
-                # Lines affected by this hunk
-                affected_lines = set(range(hunk.new_start, hunk.new_start + hunk.new_count))
+                # Lines affected by this hunk (pure deletions touch none)
+                h_lo: int = hunk.new_start
+                h_hi: int = hunk.new_start + hunk.new_count - 1
+                if h_hi < h_lo:
+                    continue
                 
-                # Find functions that overlap with these lines
-                for node in file_nodes:
-                    function_lines = set(range(node.start_line, node.end_line + 1))
+                # Only functions starting at or before the hunk's last line can overlap
+                for i in range(bisect_right(starts, h_hi)):
+                    if ends[i] < h_lo:
+                        continue
                     
-                    # If there's any overlap, this function was changed
-                    if affected_lines & function_lines:
-                        changed_func = ChangedFunction(
-                            filepath=filepath,
-                            function_name=node.name,
-                            parent_class=node.parent_class
-                        )
-                        
-                        # Avoid duplicates
-                        if not any(cf.full_path == changed_func.full_path for cf in changed_functions):
-                            changed_functions.append(changed_func)
-        
-        return changed_functions
+                    # Avoid duplicates
+                    node = file_nodes[i]
+                    if node.full_path in seen_paths:
+                        continue
+                    seen_paths.add(node.full_path)
+                    changed_nodes.append(node)
+        
+        return [
+            ChangedFunction(
+                filepath=node.filepath,
+                function_name=node.name,
+                parent_class=node.parent_class
+            )
+            for node in changed_nodes
+        ]
 
 
 # ==================== FUNCTION CONTEXT ====================
 
-@dataclass
+# A caller or callee of a changed function, with its source
+CallRef = namedtuple('CallRef', 'name qualified_name filepath start_line end_line code')
+
+
+@dataclass(slots=True)
 class FunctionContext:
     """Complete context for a changed function"""
     # The changed function itself
@@ -233,23 +353,50 @@ class FunctionContext:
     start_line: int
     end_line: int
     parameters: List[str]
-    return_type: str
+    return_type: Optional[str]
     
     # What this function calls
-    calls: List[Dict]
+    calls: List[CallRef]
     
     # What calls this function
-    called_by: List[Dict]
+    called_by: List[CallRef]
     
     # Related files
     related_files: Set[str]
     
-    # The actual code
-    function_code: str
+    # The actual code (None until loaded, see ContextBuilder.load_bodies)
+    function_code: Optional[str]
 
 
 # ==================== CONTEXT BUILDER ====================
 
+# Threads used to read function bodies in parallel
+MAX_CONTEXT_WORKERS = 16
+
+
+def _parallel_map(func, items: List) -> List:
+    """map() over items on a thread pool, keeping their order"""
+    if len(items) <= 1:
+        return [func(item) for item in items]
+    workers = min(MAX_CONTEXT_WORKERS, len(items))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items))
+
+
+def _no_code(node) -> None:
+    """Stand-in for ContextBuilder._get_function_code when bodies are deferred"""
+    return None
+
+
+# Source files at least this large are memory-mapped rather than read
+MMAP_MIN_SIZE = 1024 * 1024
+
+_RULE = "=" * 70
+
+# One caller/callee entry in the LLM context
+_RELATED_FUNCTION = "\n{0.qualified_name} ({0.filepath}:{0.start_line}):\n{0.code}\n"
+
+
 class ContextBuilder:
     """Build comprehensive context for PR review"""
     
@@ -258,15 +405,42 @@ class ContextBuilder:
         scanner: Your MultiLanguageScanner instance
         """
         self.scanner = scanner
+        
+        # Source files and function bodies read so far, shared by every
+        # caller/callee lookup of the PR
+        self._file_cache: Dict[str, Tuple[Union[bytes, mmap.mmap], List[int]]] = {}
+        self._slice_cache: Dict[tuple, str] = {}
+        self._cache_lock = threading.Lock()
+        self._analyzer = None
+    
+    @property
+    def analyzer(self) -> DiffAnalyzer:
+        """Shared DiffAnalyzer, built on first use so it sees the scanned graph"""
+        if self._analyzer is None:
+            self._analyzer = DiffAnalyzer(self.scanner)
+        return self._analyzer
+    
+    def clear_cache(self):
+        """Drop cached file contents (analyze_pr does this for each PR)"""
+        for data, _ in self._file_cache.values():
+            if isinstance(data, mmap.mmap):
+                data.close()
+        self._file_cache.clear()
+        self._slice_cache.clear()
+        self._analyzer = None
     
-    def build_context(self, changed_function: ChangedFunction, depth: int = 1) -> FunctionContext:
+    def build_context(self, changed_function: ChangedFunction, depth: int = 1,
+                      include_bodies: bool = True) -> Optional[FunctionContext]:
         """
         Build context for a changed function
         
         depth: How many levels of calls to include
                1 = direct callers/callees only
                2 = callers of callers, etc.
+        include_bodies: Read the source of the function and its callers/callees.
+                        When False the code fields are None until load_bodies()
         """
+        get_code = self._get_function_code if include_bodies else _no_code
         
         # Find the node in our graph
         node = self.scanner.node_map.get(changed_function.full_path)
@@ -285,127 +459,233 @@ class ContextBuilder:
             calls=[],
             called_by=[],
             related_files=set(),
-            function_code=self._get_function_code(node)
+            function_code=get_code(node)
         )
         
         # Get functions this calls (callees)
         for callee_path in node.calls:
             if callee_path in self.scanner.node_map:
                 callee_node = self.scanner.node_map[callee_path]
-                context.calls.append({
-                    'name': callee_node.name,
-                    'qualified_name': callee_node.qualified_name,
-                    'filepath': callee_node.filepath,
-                    'start_line': callee_node.start_line,
-                    'end_line': callee_node.end_line,
-                    'code': self._get_function_code(callee_node)
-                })
+                context.calls.append(CallRef(
+                    callee_node.name,
+                    callee_node.qualified_name,
+                    callee_node.filepath,
+                    callee_node.start_line,
+                    callee_node.end_line,
+                    get_code(callee_node)
+                ))
                 context.related_files.add(callee_node.filepath)
         
         # Get functions that call this (callers)
         for caller_path in node.called_by:
             if caller_path in self.scanner.node_map:
                 caller_node = self.scanner.node_map[caller_path]
-                context.called_by.append({
-                    'name': caller_node.name,
-                    'qualified_name': caller_node.qualified_name,
-                    'filepath': caller_node.filepath,
-                    'start_line': caller_node.start_line,
-                    'end_line': caller_node.end_line,
-                    'code': self._get_function_code(caller_node)
-                })
+                context.called_by.append(CallRef(
+                    caller_node.name,
+                    caller_node.qualified_name,
+                    caller_node.filepath,
+                    caller_node.start_line,
+                    caller_node.end_line,
+                    get_code(caller_node)
+                ))
                 context.related_files.add(caller_node.filepath)
         
         return context
     
+    def load_bodies(self, contexts: Iterable[FunctionContext]):
+        """Fill in the source code of contexts built with include_bodies=False"""
+        pending = [c for c in contexts if c.function_code is None]
+        _parallel_map(self._load_context_bodies, pending)
+    
+    def _load_context_bodies(self, context: FunctionContext):
+        """Read the code of one skeleton context and its callers/callees in place"""
+        get_code = self._get_function_code
+        context.function_code = get_code(context)
+        context.calls[:] = [ref._replace(code=get_code(ref)) for ref in context.calls]
+        context.called_by[:] = [ref._replace(code=get_code(ref)) for ref in context.called_by]
+    
     def _get_function_code(self, node) -> str:
         """Extract the actual code for a function"""
+        key = (node.filepath, node.start_line, node.end_line)
+        code = self._slice_cache.get(key)
+        if code is not None:
+            return code
+        
         try:
             # Construct full path - node.filepath is relative from repo scan
             # We need to find the actual file
             filepath = node.filepath
             
-            # If filepath doesn't exist, it might be relative to where we scanned
-            if not os.path.exists(filepath):
-                # Try to find it
-                print(f"Warning: Could not find file {filepath}")
-                return f"// File not found: {filepath}"
-            
-            # Read the file
-            with open(filepath, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            source = self._file_cache.get(filepath)
+            if source is None:
+                # If filepath doesn't exist, it might be relative to where we scanned
+                if not os.path.exists(filepath):
+                    # Try to find it
+                    print(f"Warning: Could not find file {filepath}")
+                    return f"// File not found: {filepath}"
+                
+                source = self._load_source(filepath)
+                with self._cache_lock:
+                    cached = self._file_cache.setdefault(filepath, source)
+                if cached is not source and isinstance(source[0], mmap.mmap):
+                    source[0].close()
+                source = cached
             
             # Extract the function lines
-            if node.start_line <= len(lines):
-                function_lines = lines[node.start_line - 1:node.end_line]
-                return ''.join(function_lines)
+            data, offsets = source
+            num_lines = len(offsets) - 1
+            if node.start_line <= num_lines:
+                end_line = min(node.end_line, num_lines)
+                chunk = data[offsets[node.start_line - 1]:offsets[end_line]]
+                code = chunk.decode('utf-8')
+                if b'\r' in chunk:
+                    # Match the universal-newline translation of text mode
+                    code = code.replace('\r\n', '\n').replace('\r', '\n')
+                with self._cache_lock:
+                    self._slice_cache[key] = code
+                return code
             else:
                 return f"// Line numbers out of range"
         
         except Exception as e:
             return f"// Error reading code: {e}"
     
-    def build_pr_context(self, git_diff: GitDiff) -> Dict[str, FunctionContext]:
-        """Build context for all changed functions in a PR"""
+    @staticmethod
+    def _load_source(filepath: str) -> Tuple[Union[bytes, mmap.mmap], List[int]]:
+        """
+        Read a source file as raw bytes plus a line-offset table
+        
+        Returns (data, offsets) where line N (1-based) is
+        data[offsets[N-1]:offsets[N]]. Large files are memory-mapped
+        instead of read.
+        """
+        data: Union[bytes, mmap.mmap]
+        with open(filepath, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size >= MMAP_MIN_SIZE:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = f.read()
+        
+        offsets = [0]
+        append = offsets.append
+        find = data.find
+        pos = find(b'\n')
+        while pos != -1:
+            append(pos + 1)
+            pos = find(b'\n', pos + 1)
+        if offsets[-1] != len(data):
+            # Last line has no trailing newline
+            append(len(data))
+        
+        return data, offsets
+    
+    def build_pr_context(self, git_diff: GitDiff,
+                         changed_functions: Optional[List[ChangedFunction]] = None) -> Dict[str, FunctionContext]:
+        """
+        Build context for all changed functions in a PR
+        
+        changed_functions: Result of DiffAnalyzer.find_changed_functions, if the
+                           caller already has it
+        """
         
         # Find all changed functions
-        analyzer = DiffAnalyzer(self.scanner)
-        changed_functions = analyzer.find_changed_functions(git_diff)
+        if changed_functions is None:
+            changed_functions = self.analyzer.find_changed_functions(git_diff)
         
         print(f"\nFound {len(changed_functions)} changed functions")
         
-        # Build context for each
+        return self.build_contexts(changed_functions, verbose=True)
+    
+    def build_contexts(self, changed_functions: List[ChangedFunction],
+                       verbose: bool = False,
+                       include_bodies: bool = True) -> Dict[str, FunctionContext]:
+        """
+        Build context for each changed function, keyed by full path
+        
+        With include_bodies, functions are processed on a thread pool so
+        their source reads overlap; skeletons do no I/O and are built
+        serially. Results keep the order of changed_functions.
+        """
+        if verbose:
+            for changed_func in changed_functions:
+                print(f"  Building context for: {changed_func.full_path}")
+        
+        if include_bodies:
+            results = _parallel_map(self.build_context, changed_functions)
+        else:
+            results = [self.build_context(cf, include_bodies=False) for cf in changed_functions]
+        
         contexts = {}
-        for changed_func in changed_functions:
-            print(f"  Building context for: {changed_func.full_path}")
-            context = self.build_context(changed_func)
+        for changed_func, context in zip(changed_functions, results):
             if context:
                 contexts[changed_func.full_path] = context
         
         return contexts
     
-    def format_context_for_llm(self, context: FunctionContext) -> str:
-        """Format context in a way that's easy for LLM to understand"""
+    def format_context_for_llm(self, context: FunctionContext,
+                               buf: Optional[io.StringIO] = None) -> Optional[str]:
+        """
+        Format context in a way that's easy for LLM to understand
         
-        output = []
-        output.append("="*70)
-        output.append(f"CHANGED FUNCTION: {context.qualified_name}")
-        output.append("="*70)
-        output.append(f"Location: {context.filepath}:{context.start_line}")
-        output.append(f"Parameters: {', '.join(context.parameters)}")
+        buf: Writer to append the text to; when given, nothing is returned
+        """
+        
+        if context.function_code is None:
+            self._load_context_bodies(context)
+        
+        owns_buf = buf is None
+        if buf is None:
+            buf = io.StringIO()
+        w = buf.write
+        w(_RULE)
+        w(f"\nCHANGED FUNCTION: {context.qualified_name}\n")
+        w(_RULE)
+        w(f"\nLocation: {context.filepath}:{context.start_line}\n")
+        w(f"Parameters: {', '.join(context.parameters)}\n")
         if context.return_type:
-            output.append(f"Return Type: {context.return_type}")
+            w(f"Return Type: {context.return_type}\n")
         
-        output.append("\n--- FUNCTION CODE ---")
-        output.append(context.function_code)
+        w("\n--- FUNCTION CODE ---\n")
+        w(context.function_code or "")
+        w("\n")
         
         # Functions this calls
         if context.calls:
-            output.append("\n--- FUNCTIONS IT CALLS ---")
+            w("\n--- FUNCTIONS IT CALLS ---\n")
             for callee in context.calls:
-                output.append(f"\n{callee['qualified_name']} ({callee['filepath']}:{callee['start_line']}):")
-                output.append(callee['code'])
+                w(_RELATED_FUNCTION.format(callee))
         
         # Functions that call this
         if context.called_by:
-            output.append("\n--- FUNCTIONS THAT CALL THIS ---")
+            w("\n--- FUNCTIONS THAT CALL THIS ---\n")
             for caller in context.called_by:
-                output.append(f"\n{caller['qualified_name']} ({caller['filepath']}:{caller['start_line']}):")
-                output.append(caller['code'])
+                w(_RELATED_FUNCTION.format(caller))
         
         # Related files
         if context.related_files:
-            output.append("\n--- RELATED FILES ---")
+            w("\n--- RELATED FILES ---\n")
             for filepath in sorted(context.related_files):
-                output.append(f"  - {filepath}")
+                w(f"  - {filepath}\n")
         
-        output.append("\n" + "="*70)
+        w("\n")
+        w(_RULE)
         
-        return '\n'.join(output)
+        return buf.getvalue() if owns_buf else None
 
 
 # ==================== PR CONTEXT RETRIEVER ====================
 
+_REVIEW_QUESTIONS = (
+    "\nPlease analyze:\n"
+    "1. Are there any bugs or logic errors?\n"
+    "2. Are there potential breaking changes?\n"
+    "3. Is error handling adequate?\n"
+    "4. Are there performance concerns?\n"
+    "5. Does it follow best practices?"
+)
+
+
 class PRContextRetriever:
     """Complete system for retrieving context from PRs"""
     
@@ -415,11 +695,19 @@ class PRContextRetriever:
         """
         self.scanner = scanner
         self.context_builder = ContextBuilder(scanner)
+        
+        # Last generated prompt as (key, contexts, prompt); the contexts are
+        # kept so their id() stays unique while the entry is alive
+        self._prompt_cache = None
     
-    def analyze_pr(self, diff_text: str) -> Dict:
+    def analyze_pr(self, diff_text: str, include_bodies: bool = True) -> Dict:
         """
         Analyze a PR diff and return comprehensive context
         
+        include_bodies: Read function sources now. When False, contexts only
+                        hold names/locations/call counts and their code is
+                        read when the review prompt is generated
+        
         Returns:
             {
                 'changed_files': [...],
@@ -433,6 +721,10 @@ class PRContextRetriever:
         print("ANALYZING PR DIFF")
         print("="*70)
         
+        # Files may have changed since the last PR (e.g. another checkout);
+        # this also closes the previous PR's memory maps
+        self.context_builder.clear_cache()
+        
         # Parse diff
         parser = DiffParser()
         git_diff = parser.parse(diff_text)
@@ -443,30 +735,29 @@ class PRContextRetriever:
             print(f"  [{status}] {file_diff.new_path or file_diff.old_path}")
         
         # Find changed functions
-        analyzer = DiffAnalyzer(self.scanner)
-        changed_functions = analyzer.find_changed_functions(git_diff)
+        changed_functions = self.context_builder.analyzer.find_changed_functions(git_diff)
         
         print(f"\nChanged functions: {len(changed_functions)}")
         for func in changed_functions:
             print(f"  - {func.full_path}")
         
-        # Build context for each changed function
+        # Build context for each changed function; impact analysis only
+        # needs the call graph, so source bodies are read afterwards
         print("\nBuilding context...")
-        contexts = {}
-        for changed_func in changed_functions:
-            context = self.context_builder.build_context(changed_func)
-            if context:
-                contexts[changed_func.full_path] = context
+        contexts = self.context_builder.build_contexts(changed_functions, include_bodies=False)
         
         # Build summary
         summary = {
             'total_changed_files': len(git_diff.files),
             'total_changed_functions': len(changed_functions),
-            'languages': set(f.language for f in git_diff.files if f.language),
+            'languages': tuple(sorted({f.language for f in git_diff.files if f.language})),
             'files_by_language': {},
             'impact_analysis': self._analyze_impact(contexts)
         }
         
+        if include_bodies:
+            self.context_builder.load_bodies(contexts.values())
+        
         return {
             'changed_files': git_diff.files,
             'changed_functions': changed_functions,
@@ -475,65 +766,77 @@ class PRContextRetriever:
         }
     
     def _analyze_impact(self, contexts: Dict[str, FunctionContext]) -> Dict:
-        """Analyze the impact of changes"""
+        """
+        Analyze the impact of changes
+        
+        high_impact_lines holds the ready-formatted warning lines for
+        functions with more than 5 callers.
+        """
         
         total_callers = 0
         total_callees = 0
-        high_impact_functions = []
+        high_impact_lines = []
         
-        for func_path, context in contexts.items():
+        for context in contexts.values():
             num_callers = len(context.called_by)
-            num_callees = len(context.calls)
-            
             total_callers += num_callers
-            total_callees += num_callees
+            total_callees += len(context.calls)
             
             # High impact if many functions call this
             if num_callers > 5:
-                high_impact_functions.append({
-                    'function': context.qualified_name,
-                    'callers': num_callers
-                })
+                high_impact_lines.append(
+                    f"  - {context.qualified_name} is called by {num_callers} functions"
+                )
         
         return {
             'total_callers': total_callers,
             'total_callees': total_callees,
-            'high_impact_functions': high_impact_functions,
-            'risk_level': 'HIGH' if high_impact_functions else 'MEDIUM' if total_callers > 3 else 'LOW'
+            'high_impact_lines': high_impact_lines,
+            'risk_level': 'HIGH' if high_impact_lines else 'MEDIUM' if total_callers > 3 else 'LOW'
         }
     
     def generate_review_prompt(self, pr_analysis: Dict) -> str:
         """Generate a prompt for LLM to review the PR"""
         
-        prompt_parts = []
-        prompt_parts.append("Please review this Pull Request.\n")
+        # Reuse the prompt when the same analysis is reviewed again
+        summary = pr_analysis['summary']
+        contexts = pr_analysis['contexts']
+        key = (id(contexts), len(contexts), summary['total_changed_functions'],
+               summary['total_changed_files'], tuple(summary['languages']),
+               summary['impact_analysis']['risk_level'])
+        cached = self._prompt_cache
+        if cached is not None and cached[0] == key and cached[1] is contexts:
+            return cached[2]
+        
+        buf = io.StringIO()
+        w = buf.write
+        w("Please review this Pull Request.\n\n")
         
         # Summary
-        summary = pr_analysis['summary']
-        prompt_parts.append(f"Changed {summary['total_changed_functions']} functions across {summary['total_changed_files']} files.")
-        prompt_parts.append(f"Languages: {', '.join(summary['languages'])}")
-        prompt_parts.append(f"Risk Level: {summary['impact_analysis']['risk_level']}\n")
+        w(f"Changed {summary['total_changed_functions']} functions across {summary['total_changed_files']} files.\n")
+        w(f"Languages: {', '.join(summary['languages'])}\n")
+        w(f"Risk Level: {summary['impact_analysis']['risk_level']}\n\n")
         
         # High impact warning
-        if summary['impact_analysis']['high_impact_functions']:
-            prompt_parts.append("⚠️  HIGH IMPACT CHANGES:")
-            for func_info in summary['impact_analysis']['high_impact_functions']:
-                prompt_parts.append(f"  - {func_info['function']} is called by {func_info['callers']} functions")
-            prompt_parts.append("")
-        
-        # Context for each changed function
-        for func_path, context in pr_analysis['contexts'].items():
-            formatted = self.context_builder.format_context_for_llm(context)
-            prompt_parts.append(formatted)
-        
-        prompt_parts.append("\nPlease analyze:")
-        prompt_parts.append("1. Are there any bugs or logic errors?")
-        prompt_parts.append("2. Are there potential breaking changes?")
-        prompt_parts.append("3. Is error handling adequate?")
-        prompt_parts.append("4. Are there performance concerns?")
-        prompt_parts.append("5. Does it follow best practices?")
-        
-        return '\n'.join(prompt_parts)
+        high_impact_lines = summary['impact_analysis']['high_impact_lines']
+        if high_impact_lines:
+            w("⚠️  HIGH IMPACT CHANGES:\n")
+            for line in high_impact_lines:
+                w(line)
+                w("\n")
+            w("\n")
+        
+        # Context for each changed function, written straight into the prompt
+        format_context = self.context_builder.format_context_for_llm
+        for func_path, context in contexts.items():
+            format_context(context, buf)
+            w("\n")
+        
+        w(_REVIEW_QUESTIONS)
+        
+        prompt = buf.getvalue()
+        self._prompt_cache = (key, contexts, prompt)
+        return prompt
     
     def save_context(self, pr_analysis: Dict, output_file: str = 'pr_review_context.txt'):
         """Save the PR context to a file"""
@@ -11,9 +11,167 @@ Usage:
     # Interactive mode
     python repo_rag.py interactive /path/to/repo
 """
-import sys
 import os
-from typing import Optional, Dict
+import sys
+import io
+import asyncio
+import contextlib
+import hashlib
+import pickle
+import shutil
+import threading
+from typing import Optional, Dict, List, Tuple
+
+from src.llm_integration.llm_client import LLMClient, LLMConfig
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+# Optional RAG dependencies (chromadb, sentence-transformers); a missing
+# package is reported when the component is first needed
+try:
+    from src.vector_store import ChromaVectorStore, HybridRetriever
+except ImportError:
+    ChromaVectorStore = HybridRetriever = None
+
+try:
+    from src.embeddings import EmbeddingGenerator
+except ImportError:
+    EmbeddingGenerator = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional: async prompt for interactive mode (falls back to input())
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.patch_stdout import patch_stdout
+except ImportError:
+    PromptSession = None
+
+
+_SEPARATOR = "=" * 60
+_ANSWER_BANNER = f"\n{_SEPARATOR}\n✅ Answer Generated\n{_SEPARATOR}\n"
+
+QUIT_COMMANDS = ('quit', 'exit', 'q')
+
+# Semantic answer cache: a question whose embedding has at least this cosine
+# similarity to an earlier one (with the same options) reuses its result
+SEMANTIC_CACHE_SIZE = 256
+SEMANTIC_CACHE_THRESHOLD = 0.97
+# Sign-bit prefilter: rows differing in more than this fraction of bits can't reach the threshold
+SEMANTIC_CACHE_MAX_HAMMING = 0.16
+
+_LLM_ERROR_PREFIX = "Error generating answer"
+
+# Bump when the pickled semantic tree layout or its extraction changes
+TREE_CACHE_VERSION = 3
+
+
+def _popcount(packed):
+    """Set bits per row of a packed uint8 matrix"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(packed).sum(axis=1, dtype=np.int32)
+    return np.unpackbits(packed, axis=1).sum(axis=1, dtype=np.int32)
+
+
+def _line_reader(prompt: str):
+    """
+    Async line reader for interactive mode
+
+    Uses prompt_toolkit when installed; otherwise a daemon thread feeds
+    input() lines into the event loop. Resolves to None at end of input.
+    """
+    if PromptSession is not None:
+        session = PromptSession()
+
+        async def read_prompt() -> Optional[str]:
+            try:
+                return (await session.prompt_async(prompt)).strip()
+            except EOFError:
+                return None
+
+        return read_prompt
+
+    loop = asyncio.get_running_loop()
+    lines: asyncio.Queue = asyncio.Queue()
+    wanted = threading.Semaphore(0)
+
+    def read_stdin():
+        while True:
+            wanted.acquire()
+            try:
+                line = input(prompt).strip()
+            except EOFError:
+                line = None
+            loop.call_soon_threadsafe(lines.put_nowait, line)
+            if line is None:
+                return
+
+    threading.Thread(target=read_stdin, daemon=True).start()
+
+    async def read_input() -> Optional[str]:
+        wanted.release()
+        return await lines.get()
+
+    return read_input
+
+
+def _print_token(text: str):
+    """Write streamed answer text straight to the terminal"""
+    print(text, end='', flush=True)
+
+
+class _ThreadOutput(io.TextIOBase):
+    """
+    Stand-in for sys.stdout that can hold back one thread's output
+
+    Text a thread prints inside capture() goes to a buffer of its own;
+    every other write passes straight through to the wrapped stream.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def _target(self):
+        buf = getattr(self._local, 'buf', None)
+        return self._stream if buf is None else buf
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self):
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return self._stream.isatty()
+
+    @property
+    def encoding(self):
+        return self._stream.encoding
+
+    @contextlib.contextmanager
+    def capture(self):
+        """Collect what the current thread prints; yields the StringIO"""
+        self._local.buf = buf = io.StringIO()
+        try:
+            yield buf
+        finally:
+            self._local.buf = None
+
+
+def _require(component, name: str):
+    """Return an optional component, or explain how to install it"""
+    if component is None:
+        raise ImportError(f"{name} is unavailable. Please install the RAG dependencies: "
+                          f"pip install -r requirements_rag.txt")
+    return component
 
 
 class RepoRAG:
@@ -30,7 +188,9 @@ class RepoRAG:
         self,
         repository_path: str,
         collection_name: Optional[str] = None,
-        persist_directory: str = "./chroma_db"
+        persist_directory: str = "./chroma_db",
+        chroma_host: Optional[str] = None,
+        chroma_port: int = 8000
     ):
         """
         Initialize RepoRAG
@@ -39,9 +199,14 @@ class RepoRAG:
             repository_path: Path to local repository
             collection_name: Collection name (auto-generated if None)
             persist_directory: Where to store vector database
+            chroma_host: Chroma server host; None opens persist_directory
+                in-process instead
+            chroma_port: Chroma server port
         """
         self.repository_path = os.path.abspath(repository_path)
         self.persist_directory = persist_directory
+        self.chroma_host = chroma_host
+        self.chroma_port = chroma_port
 
         if collection_name is None:
             repo_name = os.path.basename(self.repository_path)
@@ -56,14 +221,36 @@ class RepoRAG:
         self.retriever = None
         self.llm_client = None
         self.semantic_tree = None
-
-        print(f"\n{'='*60}")
-        print(f"🔍 Repository RAG System")
-        print(f"{'='*60}")
-        print(f"📁 Repository: {self.repository_path}")
-        print(f"🏷️  Collection: {self.collection_name}")
-        print(f"💾 Database: {self.persist_directory}")
-        print(f"{'='*60}\n")
+        # Reentrant: building the retriever opens the store and model under it
+        self._components_lock = threading.RLock()
+
+        # Semantic cache ring buffer (needs numpy); vectors are allocated on
+        # first insert, once the embedding size is known
+        self._sem_cache_vecs = None
+        self._sem_cache_bits = None
+        self._sem_cache_vals: List = []
+        self._sem_cache_next = 0
+        self._sem_cache_lock = threading.Lock()
+
+        # Prefer a local Ollama install, fall back to Groq
+        # (detected once; shutil.which finds ollama wherever it was installed)
+        self._llm_backend = (
+            "local" if shutil.which("ollama") or os.getenv("USE_OLLAMA") == "true" else "groq"
+        )
+        self._groq_api_key = os.getenv("GROQ_API_KEY")
+
+        # Paths are fixed after init, so the banner is assembled once
+        database = f"{chroma_host}:{chroma_port}" if chroma_host else self.persist_directory
+        self._init_banner = "\n".join([
+            f"\n{_SEPARATOR}",
+            "🔍 Repository RAG System",
+            _SEPARATOR,
+            f"📁 Repository: {self.repository_path}",
+            f"🏷️  Collection: {self.collection_name}",
+            f"💾 Database: {database}",
+            f"{_SEPARATOR}\n",
+        ])
+        print(self._init_banner)
 
     def index(self, granularity: str = "function", force_rebuild: bool = False):
         """
@@ -78,7 +265,9 @@ class RepoRAG:
         self.indexer = RepositoryIndexer(
             repository_path=self.repository_path,
             collection_name=self.collection_name,
-            persist_directory=self.persist_directory
+            persist_directory=self.persist_directory,
+            chroma_host=self.chroma_host,
+            chroma_port=self.chroma_port
         )
 
         result = self.indexer.index(
@@ -87,9 +276,13 @@ class RepoRAG:
             show_progress=True
         )
 
+        # Answers cached before the re-index may no longer match the code
+        self._semantic_cache_clear()
+
         if result['success']:
             # Store semantic tree for later use
             self.semantic_tree = self.indexer.semantic_tree
+            self._save_tree(self.semantic_tree, self._repository_fingerprint())
 
         return result
 
@@ -98,7 +291,10 @@ class RepoRAG:
         question: str,
         top_k: int = 5,
         use_llm: bool = True,
-        language_filter: Optional[str] = None
+        language_filter: Optional[str] = None,
+        expand_context: bool = True,
+        question_embedding=None,
+        stream: bool = False
     ) -> Dict:
         """
         Query the repository
@@ -108,116 +304,342 @@ class RepoRAG:
             top_k: Number of initial results
             use_llm: Whether to use LLM for answer generation
             language_filter: Filter by language
+            expand_context: Add callers/callees from the semantic tree
+                (the tree is only built or loaded when this is True)
+            question_embedding: Precomputed embedding of question (computed if None)
+            stream: Print the LLM answer as it is generated; the result then
+                has 'streamed' set so callers don't print it again
 
         Returns:
             Query result with answer and context
         """
+        prepared = self._prepare_query(
+            question, top_k, use_llm, language_filter, expand_context, question_embedding,
+            stream
+        )
+        return self._complete_query(prepared)
+
+    def _prepare_query(
+        self,
+        question: str,
+        top_k: int = 5,
+        use_llm: bool = True,
+        language_filter: Optional[str] = None,
+        expand_context: bool = True,
+        question_embedding=None,
+        stream: bool = False
+    ) -> Dict:
+        """
+        Everything in query() before the LLM call: cache lookup and retrieval
+
+        Returns:
+            Dictionary for _complete_query(); holds the final result under
+            'result' when no LLM call is needed
+        """
         # Initialize components if needed
         self._ensure_components_loaded()
 
-        print(f"\n{'='*60}")
-        print(f"❓ Question: {question}")
-        print(f"{'='*60}")
+        print(f"\n{_SEPARATOR}\n❓ Question: {question}\n{_SEPARATOR}")
+
+        # Answer near-duplicate questions from the semantic cache
+        cache_key = (top_k, use_llm, language_filter, expand_context)
+        # One embedding serves both the semantic cache and the vector search
+        q_emb = question_embedding
+        if q_emb is None:
+            q_emb = self.embedding_generator.embed_single(question)
+        q_vec = self._unit_vector(q_emb)
+        cached = self._semantic_cache_get(q_vec, cache_key)
+        if cached is not None:
+            print("\n⚡ Answered from semantic cache")
+            return {'result': {**cached, 'question': question}}
 
         # Retrieve relevant code
         retrieval_result = self.retriever.retrieve(
             question=question,
             top_k=top_k,
-            expand_context=True,
+            expand_context=expand_context,
             max_context_items=15,
-            language_filter=language_filter
+            language_filter=language_filter,
+            question_embedding=q_emb
         )
 
         if retrieval_result['total_items'] == 0:
             message = retrieval_result.get('message', "No relevant code found.")
             print(f"\n⚠️  {message}")
-            return {
+            result = {
                 'question': question,
                 'answer': f"I couldn't find any relevant code for this question.\n\n{message}\n\nThis codebase appears to be a Streamlit application with GitHub migration features, authentication, and data management utilities. Please ask questions related to this codebase.",
                 'context': []
             }
+            self._semantic_cache_put(q_vec, cache_key, result)
+            return {'result': result}
 
         # Format context for LLM
         formatted_context = self.retriever.format_for_llm(retrieval_result)
 
         # Print retrieved context
-        print("\n📦 Retrieved Context:")
-        for i, result in enumerate(retrieval_result['results'][:5], 1):
-            meta = result['metadata']
-            source = result.get('source', 'vector_search')
-            print(f"   {i}. {meta['qualified_name']} ({meta['filepath']}) [{source}]")
+        print("\n📦 Retrieved Context:\n" + "\n".join(
+            f"   {i}. {result['metadata']['qualified_name']} ({result['metadata']['filepath']}) "
+            f"[{result.get('source', 'vector_search')}]"
+            for i, result in enumerate(retrieval_result['results'][:5], 1)
+        ))
+
+        return {
+            'question': question,
+            'use_llm': use_llm,
+            'stream': stream,
+            'retrieval_result': retrieval_result,
+            'formatted_context': formatted_context,
+            'q_vec': q_vec,
+            'cache_key': cache_key
+        }
+
+    def _complete_query(self, prepared: Dict) -> Dict:
+        """Generate the answer for a _prepare_query() result"""
+        if 'result' in prepared:
+            return prepared['result']
+
+        question = prepared['question']
+        formatted_context = prepared['formatted_context']
 
         # Generate answer with LLM if requested
-        if use_llm:
-            print(f"\n🤖 Generating answer with LLM...")
-            answer = self._generate_answer(question, formatted_context)
+        streamed = False
+        answered = True
+        if prepared['use_llm']:
+            print("\n🤖 Generating answer with LLM...")
+            if prepared['stream']:
+                print("\n💡 Answer:", flush=True)
+                answer, answered = self._generate_answer(question, formatted_context, _print_token)
+                print()
+                if not answered:
+                    # Anything streamed before the failure stays on screen;
+                    # the error goes right below it
+                    print(answer)
+                streamed = True
+            else:
+                answer, answered = self._generate_answer(question, formatted_context)
         else:
             answer = "LLM disabled. See context below."
 
-        print(f"\n{'='*60}")
-        print(f"✅ Answer Generated")
-        print(f"{'='*60}\n")
+        print(_ANSWER_BANNER)
 
-        return {
+        result = {
             'question': question,
             'answer': answer,
-            'context': retrieval_result['results'],
+            'context': prepared['retrieval_result']['results'],
             'formatted_context': formatted_context
         }
+        # A failed LLM call is not worth repeating for similar questions
+        if answered:
+            self._semantic_cache_put(prepared['q_vec'], prepared['cache_key'], result)
+
+        # Flag only the returned copy; a cache hit must still print its answer
+        return {**result, 'streamed': True} if streamed else result
+
+    @staticmethod
+    def _unit_vector(embedding):
+        """Unit-length copy of a question embedding for the semantic cache (None without numpy)"""
+        if np is None:
+            return None
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _semantic_cache_get(self, q_vec, key: tuple) -> Optional[Dict]:
+        """Cached result of the most similar earlier question, if close enough"""
+        if q_vec is None:
+            return None
+        q_bits = np.packbits(q_vec > 0)
+        with self._sem_cache_lock:
+            count = len(self._sem_cache_vals)
+            if count == 0:
+                return None
+            # Hamming distance over packed sign bits narrows the rows worth a float dot product
+            dists = _popcount(np.bitwise_xor(self._sem_cache_bits[:count], q_bits))
+            rows = np.flatnonzero(dists <= SEMANTIC_CACHE_MAX_HAMMING * q_vec.shape[0])
+            if rows.size == 0:
+                return None
+            sims = self._sem_cache_vecs[rows] @ q_vec
+            order = np.argsort(-sims)
+            for i in order[sims[order] >= SEMANTIC_CACHE_THRESHOLD]:
+                cached_key, result = self._sem_cache_vals[rows[i]]
+                if cached_key == key:
+                    return result
+        return None
+
+    def _semantic_cache_put(self, q_vec, key: tuple, result: Dict):
+        """Remember a result, overwriting the oldest entry once the cache is full"""
+        if q_vec is None:
+            return
+        with self._sem_cache_lock:
+            if self._sem_cache_vecs is None:
+                dim = q_vec.shape[0]
+                self._sem_cache_vecs = np.zeros((SEMANTIC_CACHE_SIZE, dim), dtype=np.float32)
+                self._sem_cache_bits = np.zeros((SEMANTIC_CACHE_SIZE, (dim + 7) // 8), dtype=np.uint8)
+            slot = self._sem_cache_next
+            self._sem_cache_vecs[slot] = q_vec
+            self._sem_cache_bits[slot] = np.packbits(q_vec > 0)
+            if slot < len(self._sem_cache_vals):
+                self._sem_cache_vals[slot] = (key, result)
+            else:
+                self._sem_cache_vals.append((key, result))
+            self._sem_cache_next = (slot + 1) % SEMANTIC_CACHE_SIZE
+
+    def _semantic_cache_clear(self):
+        """Forget every cached result"""
+        with self._sem_cache_lock:
+            self._sem_cache_vals = []
+            self._sem_cache_next = 0
 
     def _ensure_components_loaded(self):
         """Ensure all components are initialized"""
-        if self.vector_store is None:
-            from src.vector_store import ChromaVectorStore
-            self.vector_store = ChromaVectorStore(
-                persist_directory=self.persist_directory,
-                collection_name=self.collection_name
-            )
+        self._ensure_vector_components()
+        self._ensure_retriever()
 
-        if self.embedding_generator is None:
-            from src.embeddings import EmbeddingGenerator
-            self.embedding_generator = EmbeddingGenerator()
+    def _ensure_vector_components(self):
+        """Open the vector store and load the embedding model"""
+        self._get_vector_store()
+        self._get_embedding_generator()
 
+    def _get_vector_store(self):
+        """Vector store, opened once even when several threads ask at the same time"""
+        if self.vector_store is None:
+            with self._components_lock:
+                if self.vector_store is None:
+                    self.vector_store = _require(ChromaVectorStore, "ChromaVectorStore")(
+                        persist_directory=self.persist_directory,
+                        collection_name=self.collection_name,
+                        host=self.chroma_host,
+                        port=self.chroma_port
+                    )
+        return self.vector_store
+
+    def _get_embedding_generator(self):
+        """Embedding model, loaded once even when several threads ask at the same time"""
+        if self.embedding_generator is None:
+            with self._components_lock:
+                if self.embedding_generator is None:
+                    self.embedding_generator = _require(EmbeddingGenerator, "EmbeddingGenerator")()
+        return self.embedding_generator
+
+    def _ensure_retriever(self):
+        """Create the retriever; the semantic tree is only built when it first
+        expands context"""
+        if self.retriever is None:
+            with self._components_lock:
+                if self.retriever is None:
+                    self.retriever = _require(HybridRetriever, "HybridRetriever")(
+                        vector_store=self._get_vector_store(),
+                        semantic_tree=self.semantic_tree,
+                        repository_path=self.repository_path,
+                        embedding_generator=self._get_embedding_generator(),
+                        tree_provider=self._get_semantic_tree
+                    )
+
+    def _get_semantic_tree(self) -> Dict:
+        """Semantic tree, built or loaded from the disk cache on first use"""
         if self.semantic_tree is None:
-            # Need to rebuild semantic tree
-            from semantic_tree_builder import MultiLanguageScanner
-            print("🔄 Building semantic tree...")
-            scanner = MultiLanguageScanner()
-            nodes = scanner.scan_repository(self.repository_path)
-            node_map = scanner.node_map
-            self.semantic_tree = {'nodes': nodes, 'node_map': node_map}
+            self.semantic_tree = self._build_or_load_tree()
+        return self.semantic_tree
 
-        if self.retriever is None:
-            from src.vector_store import HybridRetriever
-            self.retriever = HybridRetriever(
-                vector_store=self.vector_store,
-                semantic_tree=self.semantic_tree,
-                repository_path=self.repository_path,
-                embedding_generator=self.embedding_generator
-            )
-
-    def _generate_answer(self, question: str, context: str) -> str:
+    @property
+    def _tree_cache_path(self) -> str:
+        return os.path.join(self.persist_directory, f"{self.collection_name}.tree.pkl")
+
+    @property
+    def _parse_cache_dir(self) -> str:
+        # Per-file parse results, so a rebuild after an edit only reparses changed files
+        return os.path.join(self.persist_directory, f"{self.collection_name}.parse_cache")
+
+    def _build_or_load_tree(self) -> Dict:
+        """
+        Semantic tree of the repository, reused from disk when no source
+        file has changed since it was saved
+
+        Returns:
+            Dict with 'nodes' and 'node_map'
+        """
+        fingerprint = self._repository_fingerprint()
+
+        try:
+            with open(self._tree_cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('version') == TREE_CACHE_VERSION and cached.get('fingerprint') == fingerprint:
+                print("🌳 Loaded semantic tree from cache")
+                return cached['tree']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable semantic tree cache: {e}")
+
+        # Need to rebuild semantic tree
+        from semantic_tree_builder import MultiLanguageScanner
+        print("🔄 Building semantic tree...")
+        scanner = MultiLanguageScanner(cache_dir=self._parse_cache_dir)
+        nodes = scanner.scan_repository(self.repository_path)
+        tree = {'nodes': nodes, 'node_map': scanner.node_map}
+
+        self._save_tree(tree, fingerprint)
+        return tree
+
+    def _save_tree(self, tree: Dict, fingerprint: str):
+        """Pickle the semantic tree next to the vector database"""
+        try:
+            os.makedirs(self.persist_directory, exist_ok=True)
+            tmp_path = self._tree_cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(
+                    {'version': TREE_CACHE_VERSION, 'fingerprint': fingerprint, 'tree': tree},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, self._tree_cache_path)
+        except Exception as e:
+            print(f"⚠️  Could not cache semantic tree: {e}")
+
+    def _repository_fingerprint(self) -> str:
+        """Hash of (path, mtime, size) of every source file the scanner would parse"""
+        from semantic_tree_builder import LanguageDetector, MultiLanguageScanner
+
+        extensions = LanguageDetector.LANGUAGE_MAP
+        ignored_dirs = MultiLanguageScanner.DEFAULT_IGNORE
+        entries = []
+        stack = [self.repository_path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in ignored_dirs and not entry.name.startswith('.'):
+                                stack.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in extensions:
+                            st = entry.stat()
+                            entries.append(f"{entry.path}\0{st.st_mtime_ns}\0{st.st_size}")
+            except OSError:
+                continue
+
+        digest = hashlib.sha1()
+        for line in sorted(entries):
+            digest.update(line.encode('utf-8', 'surrogateescape'))
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def _generate_answer(self, question: str, context: str, on_token=None) -> Tuple[str, bool]:
         """
         Generate answer using LLM
 
         Args:
             question: User question
             context: Retrieved code context
+            on_token: Optional callback receiving answer text as it streams in
 
         Returns:
-            LLM-generated answer
+            (answer, answered): the LLM-generated answer, or an error message
+            with answered False when the LLM call failed
         """
         if self.llm_client is None:
-            from src.llm_integration.llm_client import LLMClient, LLMConfig
-            import os
-            from dotenv import load_dotenv
-
-            load_dotenv()
-
             # Try to use Ollama first (local), fallback to Groq
-            ollama_available = os.path.exists("/usr/local/bin/ollama") or os.getenv("USE_OLLAMA") == "true"
-
-            if ollama_available:
+            if self._llm_backend == "local":
                 # Use local Ollama (free, private, offline)
                 config = LLMConfig(
                     provider="local",
@@ -231,7 +653,7 @@ class RepoRAG:
                 config = LLMConfig(
                     provider="groq",
                     model="llama-3.1-70b-versatile",
-                    api_key=os.getenv("GROQ_API_KEY"),
+                    api_key=self._groq_api_key,
                     temperature=0.7,
                     max_tokens=2000
                 )
@@ -240,140 +662,220 @@ class RepoRAG:
 
         try:
             # Use the answer_question method from LLMClient
-            response = self.llm_client.answer_question(question, context)
-            return response
+            response = self.llm_client.answer_question(question, context, on_token, raise_errors=True)
+            return response, True
         except Exception as e:
-            return f"Error generating answer: {e}\n\nPlease review the context above."
+            return f"{_LLM_ERROR_PREFIX}: {e}\n\nPlease review the context above.", False
 
     def interactive(self):
         """Interactive query mode"""
         print("\n🎯 Interactive Mode")
         print("Type your questions (or 'quit' to exit)\n")
 
-        while True:
+        with contextlib.ExitStack() as stack:
+            if PromptSession is not None:
+                # Keeps the prompt below anything printed while it is open
+                stack.enter_context(patch_stdout())
+            output = _ThreadOutput(sys.stdout)
+            stack.enter_context(contextlib.redirect_stdout(output))
             try:
-                question = input("\n❓ Your question: ").strip()
+                asyncio.run(self._interactive_loop(output))
+            except KeyboardInterrupt:
+                print("\n\n👋 Goodbye!")
+
+    async def _interactive_loop(self, output: _ThreadOutput):
+        """
+        Read questions while earlier ones are still being answered
 
-                if question.lower() in ['quit', 'exit', 'q']:
-                    print("👋 Goodbye!")
+        Each question's retrieval starts as soon as it is entered, so it
+        overlaps the LLM call for the previous question; answers are still
+        generated and printed one at a time, in order. What retrieval
+        prints is held back in the prepared query and printed just before
+        its answer, so it never lands inside the answer being streamed.
+        """
+        # Warm up embeddings, vector store and retriever while the user types
+        warmup = asyncio.create_task(asyncio.to_thread(self._ensure_components_loaded))
+        pending: asyncio.Queue = asyncio.Queue()
+
+        def prepare_quietly(question: str) -> Dict:
+            with output.capture() as buf:
+                try:
+                    prepared = self._prepare_query(question, 5, True, stream=True)
+                except Exception as e:
+                    prepared = {'error': e}
+            prepared['output'] = buf.getvalue()
+            return prepared
+
+        async def prepare(question: str) -> Dict:
+            try:
+                await warmup
+            except Exception as e:
+                # Missing RAG dependencies or an unreadable store: report it
+                # for this question, like any other failure
+                return {'error': e, 'output': ''}
+            return await asyncio.to_thread(prepare_quietly, question)
+
+        async def answer_in_order():
+            while True:
+                task = await pending.get()
+                if task is None:
+                    return
+                prepared = await task
+                print(prepared.pop('output'), end='')
+                try:
+                    if 'error' in prepared:
+                        raise prepared['error']
+                    result = await asyncio.to_thread(self._complete_query, prepared)
+                    if not result.get('streamed'):
+                        print(f"\n💡 Answer:\n{result['answer']}\n")
+                except Exception as e:
+                    print(f"\n❌ Error: {e}\n")
+
+        answerer = asyncio.create_task(answer_in_order())
+        read_line = _line_reader("\n❓ Your question: ")
+        try:
+            while True:
+                question = await read_line()
+                if question is None or question.lower() in QUIT_COMMANDS:
                     break
+                if question:
+                    pending.put_nowait(asyncio.create_task(prepare(question)))
+        finally:
+            # Let questions already entered finish before leaving
+            pending.put_nowait(None)
+            await answerer
+            if warmup.done() and not warmup.cancelled():
+                # A warm-up failure was reported with each question; mark it
+                # retrieved so asyncio doesn't log it again
+                warmup.exception()
+
+        print("👋 Goodbye!")
 
-                if not question:
-                    continue
+    def get_stats(self) -> Dict:
+        """Get indexing statistics"""
+        return self._get_vector_store().get_stats()
 
-                # Query
-                result = self.query(question, use_llm=True)
 
-                # Print answer
-                print(f"\n💡 Answer:\n{result['answer']}\n")
+def _make_rag(args) -> RepoRAG:
+    """RepoRAG for a parsed command line"""
+    return RepoRAG(args.repo_path, chroma_host=args.chroma_host, chroma_port=args.chroma_port)
 
-            except KeyboardInterrupt:
-                print("\n\n👋 Goodbye!")
-                break
-            except Exception as e:
-                print(f"\n❌ Error: {e}\n")
 
-    def get_stats(self) -> Dict:
-        """Get indexing statistics"""
-        if self.vector_store is None:
-            from src.vector_store import ChromaVectorStore
-            self.vector_store = ChromaVectorStore(
-                persist_directory=self.persist_directory,
-                collection_name=self.collection_name
-            )
+def _cmd_index(args):
+    """index command"""
+    rag = _make_rag(args)
+    rag.index(granularity=args.granularity, force_rebuild=args.force_rebuild)
 
-        return self.vector_store.get_stats()
+
+def _cmd_query(args):
+    """query command"""
+    rag = _make_rag(args)
+    result = rag.query(
+        args.question,
+        use_llm=not args.no_llm,
+        language_filter=args.language,
+        expand_context=not args.no_expand,
+        stream=True
+    )
+
+    if not result.get('streamed'):
+        print(f"\n💡 Answer:\n{result['answer']}\n")
+
+
+def _cmd_interactive(args):
+    """interactive command"""
+    rag = _make_rag(args)
+
+    # Check if index exists
+    stats = rag.get_stats()
+    if stats['total_documents'] == 0:
+        print("\n⚠️  No index found. Indexing repository first...")
+        rag.index()
+
+    rag.interactive()
+
+
+def _cmd_stats(args):
+    """stats command"""
+    rag = _make_rag(args)
+    stats = rag.get_stats()
+
+    print(
+        "\n📊 Index Statistics:\n"
+        f"   Total documents: {stats['total_documents']}\n"
+        f"   Languages: {stats['languages']}\n"
+        f"   Node types: {stats['node_types']}\n"
+    )
 
 
 def main():
     """CLI interface"""
     import argparse
 
-    parser = argparse.ArgumentParser(description="Repository RAG System")
-    parser.add_argument(
-        'command',
-        choices=['index', 'query', 'interactive', 'stats'],
-        help='Command to execute'
+    # Options shared by every command
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        '--chroma-host',
+        help='Use a running Chroma server at this host instead of the local database'
     )
-    parser.add_argument(
-        'path_or_query',
-        nargs='?',
-        help='Repository path (for index/interactive) or query (for query)'
+    common.add_argument(
+        '--chroma-port',
+        type=int,
+        default=8000,
+        help='Chroma server port'
     )
-    parser.add_argument(
+
+    parser = argparse.ArgumentParser(description="Repository RAG System")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = subparsers.add_parser('index', parents=[common], help='Index a repository')
+    index_parser.add_argument('repo_path', help='Repository path')
+    index_parser.add_argument(
         '--granularity',
         default='function',
         choices=['function', 'class', 'file'],
         help='Chunking granularity for indexing'
     )
-    parser.add_argument(
+    index_parser.add_argument(
         '--force-rebuild',
         action='store_true',
         help='Force rebuild index'
     )
-    parser.add_argument(
+    index_parser.set_defaults(handler=_cmd_index)
+
+    query_parser = subparsers.add_parser('query', parents=[common], help='Ask a single question')
+    query_parser.add_argument('question', help='Natural language question')
+    query_parser.add_argument(
+        '--repo-path',
+        default='.',
+        help='Repository path'
+    )
+    query_parser.add_argument(
         '--no-llm',
         action='store_true',
         help='Disable LLM answer generation'
     )
-    parser.add_argument(
+    query_parser.add_argument(
+        '--no-expand',
+        action='store_true',
+        help='Vector search only; skip semantic tree expansion'
+    )
+    query_parser.add_argument(
         '--language',
         help='Filter by programming language'
     )
-    parser.add_argument(
-        '--repo-path',
-        help='Repository path (for query command)'
-    )
-
-    args = parser.parse_args()
+    query_parser.set_defaults(handler=_cmd_query)
 
-    if args.command == 'index':
-        if not args.path_or_query:
-            print("❌ Error: Please provide repository path")
-            sys.exit(1)
-
-        rag = RepoRAG(args.path_or_query)
-        rag.index(granularity=args.granularity, force_rebuild=args.force_rebuild)
-
-    elif args.command == 'query':
-        if not args.path_or_query:
-            print("❌ Error: Please provide a query")
-            sys.exit(1)
-
-        repo_path = args.repo_path or '.'
-        rag = RepoRAG(repo_path)
-        result = rag.query(
-            args.path_or_query,
-            use_llm=not args.no_llm,
-            language_filter=args.language
-        )
-
-        print(f"\n💡 Answer:\n{result['answer']}\n")
-
-    elif args.command == 'interactive':
-        if not args.path_or_query:
-            print("❌ Error: Please provide repository path")
-            sys.exit(1)
+    interactive_parser = subparsers.add_parser('interactive', parents=[common], help='Ask questions interactively')
+    interactive_parser.add_argument('repo_path', help='Repository path')
+    interactive_parser.set_defaults(handler=_cmd_interactive)
 
-        rag = RepoRAG(args.path_or_query)
+    stats_parser = subparsers.add_parser('stats', parents=[common], help='Show index statistics')
+    stats_parser.add_argument('repo_path', nargs='?', default='.', help='Repository path')
+    stats_parser.set_defaults(handler=_cmd_stats)
 
-        # Check if index exists
-        stats = rag.get_stats()
-        if stats['total_documents'] == 0:
-            print("\n⚠️  No index found. Indexing repository first...")
-            rag.index()
-
-        rag.interactive()
-
-    elif args.command == 'stats':
-        repo_path = args.path_or_query or '.'
-        rag = RepoRAG(repo_path)
-        stats = rag.get_stats()
-
-        print(f"\n📊 Index Statistics:")
-        print(f"   Total documents: {stats['total_documents']}")
-        print(f"   Languages: {stats['languages']}")
-        print(f"   Node types: {stats['node_types']}\n")
+    args = parser.parse_args()
+    args.handler(args)
 
 
 if __name__ == '__main__':
@@ -4,15 +4,6 @@ Review GitHub Pull Requests with semantic context and LLM analysis
 """
 import os
 import argparse
-from dotenv import load_dotenv
-from src.pr_review.pr_reviewer import PRReviewer
-from src.llm_integration.llm_client import LLMConfig
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Import after load_dotenv to ensure env vars are loaded
-import os
 
 
 def main():
@@ -31,6 +22,15 @@ def main():
 
     args = parser.parse_args()
 
+    # Heavy imports wait until the arguments are valid, so --help and usage
+    # errors return immediately
+    from dotenv import load_dotenv
+    from src.pr_review.pr_reviewer import PRReviewer
+    from src.llm_integration.llm_client import LLMConfig
+
+    # Load environment variables from .env file
+    load_dotenv()
+
     # Determine model based on provider
     if args.llm_model:
         model = args.llm_model
@@ -44,6 +44,13 @@ def main():
         else:
             model = 'llama2'  # For local
 
+    # Fail fast on a missing API key, before printing the banner or
+    # setting up the reviewer
+    if args.llm_provider != 'local':
+        key_var = f'{args.llm_provider.upper()}_API_KEY'
+        if not (args.api_key or os.getenv(key_var)):
+            parser.error(f"no API key for {args.llm_provider}: pass --api-key or set {key_var} in .env")
+
     # Create LLM config
     llm_config = LLMConfig(
         provider=args.llm_provider,
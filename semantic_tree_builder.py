@@ -1,12 +1,182 @@
-from tree_sitter import Language, Parser
+from tree_sitter import Language, Parser, Query, QueryCursor
 import tree_sitter_python as tspython
 import tree_sitter_java as tsjava
 import tree_sitter_c as tsc
 import tree_sitter_cpp as tscpp
+import hashlib
+import heapq
+import io
+import mmap
+import multiprocessing
 import os
-from collections import defaultdict
+import pickle
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+# Below this many files, worker start-up costs more than parallel parsing saves
+PARALLEL_MIN_FILES = 64
+
+# Directory listing threads; scandir/stat release the GIL, so these overlap I/O
+WALK_THREADS = 32
+
+# Scan progress is reported every this many files or seconds, not per file
+PROGRESS_EVERY_FILES = 500
+PROGRESS_INTERVAL = 0.5
+
+# Bump when extraction changes so cached per-file results are not reused
+PARSE_CACHE_VERSION = 2
+
+# Per-file parse cache entries kept; the least recently used go first
+PARSE_CACHE_MAX_FILES = 50000
+
+# Kernel readahead hint for source files (not available on every platform)
+_fadvise = getattr(os, 'posix_fadvise', None)
+
+# Files at least this large are memory-mapped instead of copied into bytes
+MMAP_MIN_BYTES = 1 << 20
+
+# Distinct identifier spellings remembered across files before starting over
+TEXT_CACHE_MAX = 100000
+
+# Parse trees kept for reuse by byte-identical files later in the same scan
+TREE_CACHE_MAX = 256
+
+# node_type values the function and type lookups match
+_FUNCTION_KINDS = frozenset({'function', 'method'})
+_TYPE_KINDS = frozenset({'class', 'enum', 'interface'})
+
+# Scanner owned by each worker process (tree-sitter parsers can't be pickled)
+_worker_scanner = None
+
+
+def _worker_context():
+    """
+    Start method for scan worker processes
+
+    A forked child of a multi-threaded process can deadlock, and scans do
+    run next to other threads (repo_rag builds the tree inside
+    asyncio.to_thread). When other threads are alive, workers come from
+    forkserver (spawn where that is unavailable); otherwise the platform
+    default is kept, so single-threaded scripts without a __main__ guard
+    still work.
+    """
+    if threading.active_count() == 1:
+        return multiprocessing.get_context()
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def _init_scan_worker(scanner_cls, ignore_patterns, cache_dir):
+    """Build the per-process scanner; its parser-loading messages are discarded"""
+    global _worker_scanner
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            _worker_scanner = scanner_cls(ignore_patterns, cache_dir=cache_dir)
+        finally:
+            sys.stdout = stdout
+
+
+def _scan_file_in_worker(item):
+    """Parse one file in a worker; returns (nodes, error message or None)"""
+    filepath, rel_path, language = item
+    scanner = _worker_scanner
+    scanner.nodes = []
+    scanner.node_map = {}
+    try:
+        scanner.scan_file(filepath, rel_path, language)
+        return scanner.nodes, None
+    except Exception as e:
+        return scanner.nodes, str(e)
+
+
+def _read_source(filepath):
+    """
+    Read a whole file with one fstat-sized os.read, hinting sequential access
+    
+    Files of MMAP_MIN_BYTES or more come back as a read-only mmap instead:
+    tree-sitter and the extractors' slicing read it like bytes, but the
+    pages stay in the page cache rather than being copied onto the heap.
+    The caller closes it.
+    """
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if size >= MMAP_MIN_BYTES:
+            try:
+                return mmap.mmap(fd, size, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Not mappable (e.g. a special file); read it normally
+                pass
+        if _fadvise is not None and size:
+            try:
+                _fadvise(fd, 0, size, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        data = os.read(fd, size)
+        if len(data) == size:
+            return data
+        # Short read: collect the rest up to EOF
+        chunks = [data]
+        while True:
+            chunk = os.read(fd, 1 << 20)
+            if not chunk:
+                return b''.join(chunks)
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+
+
+def _changed_span(old, new):
+    """
+    Byte range that differs between two versions of a file
+    
+    Returns (start, old_end, new_end): old[start:old_end] was replaced by
+    new[start:new_end]. The common prefix and suffix are found by binary
+    search over slice comparisons, which run as memcmp.
+    """
+    lo, hi = 0, min(len(old), len(new))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    start = lo
+    
+    # The suffix may not overlap the prefix in either version
+    lo, hi = 0, min(len(old), len(new)) - start
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return start, len(old) - lo, len(new) - lo
+
+
+def _point_at(source, offset):
+    """(row, column) of a byte offset, counted the way tree-sitter does"""
+    row = source.count(b'\n', 0, offset)
+    return row, offset - (source.rfind(b'\n', 0, offset) + 1)
+
 
 class SemanticNode:
+    # Fixed attribute set: no per-instance __dict__, and slot access is cheaper
+    __slots__ = (
+        'name', 'node_type', 'start_line', 'end_line', 'filepath', 'language',
+        'parent_class', 'qualified_name', 'full_path', 'calls', 'called_by',
+        'parameters', 'return_type',
+    )
+    
     def __init__(self, name, node_type, start_line, end_line, filepath=None, language=None):
         self.name = name
         self.node_type = node_type  # 'class', 'enum', 'interface', 'function', 'method'
@@ -18,8 +188,10 @@ class SemanticNode:
         self.qualified_name = None
         self.full_path = None
         self.calls = []
-        self.called_by = []
-        self.parameters = []
+        # Shared empty default; build_call_graph gives called nodes their own list
+        self.called_by = ()
+        # Tuple, set once per node; parameterless nodes share the empty tuple
+        self.parameters = ()
         self.return_type = None
     
     def __repr__(self):
@@ -46,6 +218,17 @@ class LanguageDetector:
     def detect(filepath):
         _, ext = os.path.splitext(filepath)
         return LanguageDetector.LANGUAGE_MAP.get(ext.lower())
+    
+    @staticmethod
+    def detect_name(name):
+        """detect() for a bare file name (a leading dot does not start an extension)"""
+        dot = name.rfind('.')
+        if dot <= 0:
+            return None
+        ext = name[dot:]
+        language_map = LanguageDetector.LANGUAGE_MAP
+        # Keys are lowercase; only mixed-case extensions pay for lower()
+        return language_map.get(ext) or language_map.get(ext.lower())
 
 
 class MultiLanguageScanner:
@@ -58,91 +241,357 @@ class MultiLanguageScanner:
         '*.egg-info', '.eggs', 'migrations', 'tests', 'test',
     }
     
-    def __init__(self, ignore_patterns=None):
+    # Byte strings every file that yields nodes must contain; a file with
+    # none of them is counted without being parsed. Python definitions need
+    # def/class, Java members live in a type body, C/C++ function bodies
+    # need a brace (a C++ forward declaration still says class)
+    PRESCREEN_MARKERS = {
+        'python': (b'def', b'class'),
+        'java': (b'class', b'interface', b'enum', b'record'),
+        'c': (b'{',),
+        'cpp': (b'{', b'class'),
+    }
+    
+    # Per language: tree-sitter grammar, display name, node extractor and
+    # call-site resolver. A new language is a row here plus its methods,
+    # a CALL_QUERIES entry and PRESCREEN_MARKERS
+    LANG_SPEC = {
+        'python': (tspython, 'Python', '_extract_python', '_resolve_call_python'),
+        'java': (tsjava, 'Java', '_extract_java', '_resolve_call_java'),
+        'c': (tsc, 'C', '_extract_c', '_resolve_call_c'),
+        'cpp': (tscpp, 'C++', '_extract_cpp', '_resolve_call_cpp'),
+    }
+    
+    # Statistics bucket for each node type
+    STAT_KEYS = {
+        'class': 'classes', 'enum': 'enums', 'interface': 'interfaces',
+        'function': 'functions', 'method': 'methods',
+    }
+    
+    # Node types whose subtrees never hold a definition the extractors record;
+    # the definition walk steps over them instead of visiting every node of
+    # each statement. Java class bodies and C++ declarations can nest types
+    # (anonymous classes, `class X {...} x;`), so only their imports and
+    # preprocessor lines are skipped
+    OPAQUE_NODES = {
+        'python': (
+            'expression_statement', 'return_statement', 'import_statement',
+            'import_from_statement', 'future_import_statement', 'assert_statement',
+            'raise_statement', 'delete_statement', 'global_statement',
+            'nonlocal_statement', 'print_statement', 'exec_statement',
+            'type_alias_statement', 'decorator', 'argument_list', 'call',
+            'comparison_operator', 'boolean_operator', 'not_operator', 'string',
+        ),
+        'java': ('package_declaration', 'import_declaration'),
+        'c': (
+            'preproc_include', 'preproc_def', 'preproc_function_def', 'preproc_call',
+            'expression_statement', 'return_statement', 'declaration',
+            'type_definition', 'struct_specifier', 'union_specifier', 'enum_specifier',
+            'parenthesized_expression',
+        ),
+        'cpp': (
+            'preproc_include', 'preproc_def', 'preproc_function_def', 'preproc_call',
+            'using_declaration', 'alias_declaration', 'namespace_alias_definition',
+            'static_assert_declaration', 'enum_specifier',
+        ),
+    }
+    
+    # Call sites per language, matched inside libtree-sitter instead of by a
+    # Python walk over every node of a function body
+    CALL_QUERIES = {
+        'python': """
+            (call function: [
+                (identifier) @id
+                (attribute object: _ @obj attribute: _ @attr)
+            ]) @call
+        """,
+        'java': """
+            (method_invocation object: _ ? @obj name: _ @name) @call
+        """,
+        'c': """
+            (call_expression function: (identifier) @id) @call
+        """,
+        'cpp': """
+            (call_expression function: [
+                (identifier) @id
+                (field_expression argument: _ @obj field: _ @field)
+            ]) @call
+        """,
+    }
+    
+    def __init__(self, ignore_patterns=None, max_workers=None, cache_dir=None, incremental=False):
         self.parsers = {}
+        self._call_cursors = {}
+        self._extractors = {}
+        self._kind_ids = {}
+        self._text_cache = {}
+        self._target_cache = {}
+        self._tree_cache = {}
+        self._call_owners = []
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        # Keep each file's tree so a later scan_repository() reparses only
+        # what changed; see _parse_incremental
+        self.incremental = incremental
+        self._trees = {}
+        self._previous_trees = {}
         self.nodes = []
         self.node_map = {}
+        self.fns_by_file = {}
+        self._functions_by_name = {}
+        self._types_by_name = {}
+        self._types = []
+        self._methods_by_class = {}
+        self._most_called_by_class = {}
+        self._indexed_nodes = None
         self.file_count = 0
         self.error_count = 0
         
         self.ignore_patterns = self.DEFAULT_IGNORE.copy()
         if ignore_patterns:
             self.ignore_patterns.update(ignore_patterns)
+        self._compile_ignore_patterns()
         
         self._setup_parsers()
     
     def _setup_parsers(self):
         """Initialize parsers for all supported languages"""
-        try:
-            py_lang = Language(tspython.language())
-            self.parsers['python'] = Parser(py_lang)
-            print("✓ Python parser loaded")
-        except Exception as e:
-            print(f"✗ Python parser failed: {e}")
+        for language, (grammar, label, extract, resolve_call) in self.LANG_SPEC.items():
+            try:
+                lang = Language(grammar.language())
+                self.parsers[language] = Parser(lang)
+                self._call_cursors[language] = QueryCursor(Query(lang, self.CALL_QUERIES[language]))
+                kind_ids = {}
+                for kind_id in range(lang.node_kind_count):
+                    kind_ids.setdefault(lang.node_kind_for_id(kind_id), []).append(kind_id)
+                self._kind_ids[language] = kind_ids
+                self._extractors[language] = (getattr(self, extract), getattr(self, resolve_call))
+                print(f"✓ {label} parser loaded")
+            except Exception as e:
+                print(f"✗ {label} parser failed: {e}")
+    
+    def _text(self, source_code, node):
+        """
+        Source text of a node, decoded once per spelling and interned
         
-        try:
-            java_lang = Language(tsjava.language())
-            self.parsers['java'] = Parser(java_lang)
-            print("✓ Java parser loaded")
-        except Exception as e:
-            print(f"✗ Java parser failed: {e}")
+        Identifiers like self/this and common method names repeat throughout
+        a repository. Keying the cache on the raw bytes means each spelling
+        is decoded once, in any file, and every copy shares one string.
+        """
+        raw = source_code[node.start_byte:node.end_byte]
+        cache = self._text_cache
+        text = cache.get(raw)
+        if text is None:
+            if len(cache) >= TEXT_CACHE_MAX:
+                cache.clear()
+            text = cache[raw] = sys.intern(raw.decode())
+        return text
+    
+    def _call_target(self, filepath, scope, name):
+        """
+        Interned "filepath::scope.name" (or "filepath::name" without a scope)
         
-        try:
-            c_lang = Language(tsc.language())
-            self.parsers['c'] = Parser(c_lang)
-            print("✓ C parser loaded")
-        except Exception as e:
-            print(f"✗ C parser failed: {e}")
+        The same callee is resolved over and over within a file, so each
+        (scope, name) pair is formatted and interned once per file; the
+        cache is reset with the other per-file state in _scan_source.
+        """
+        key = (scope, name)
+        target = self._target_cache.get(key)
+        if target is None:
+            if scope:
+                target = f"{filepath}::{scope}.{name}"
+            else:
+                target = f"{filepath}::{name}"
+            target = self._target_cache[key] = sys.intern(target)
+        return target
+    
+    @staticmethod
+    def _skip_subtree(node, *context):
+        """
+        Handler for OPAQUE_NODES: nothing to record, nothing to descend into
         
-        try:
-            cpp_lang = Language(tscpp.language())
-            self.parsers['cpp'] = Parser(cpp_lang)
-            print("✓ C++ parser loaded")
-        except Exception as e:
-            print(f"✗ C++ parser failed: {e}")
+        Error recovery can bury definitions anywhere (C++ headers parsed as
+        C end up inside expression statements), so subtrees with parse
+        errors are still walked.
+        """
+        if node.has_error:
+            return node, context
+    
+    def _dispatch_table(self, language, handlers):
+        """
+        Re-key a node-type -> handler dict by kind_id
+        
+        A grammar can give several symbols the same name (aliases), so every
+        id spelled like a handled type gets the handler; _walk_children then
+        looks up the node's integer kind_id instead of building node.type.
+        """
+        kind_ids = self._kind_ids[language]
+        return {
+            kind_id: handler
+            for node_type, handler in handlers.items()
+            for kind_id in kind_ids.get(node_type, ())
+        }
+    
+    def _walk_children(self, parent, handlers, *context):
+        """
+        Visit the subtree below parent with TreeCursors, without recursion
+        
+        handlers comes from _dispatch_table(). Nodes whose kind has a
+        handler are passed to handler(node, *context)
+        and are not descended into (_skip_subtree just stops there), unless
+        the handler returns a
+        (subtree, context) pair: the children of subtree are then walked
+        right away with that context before moving on. All other nodes are
+        descended into. Nesting is kept on an explicit stack of suspended
+        cursors, so deep nesting never touches the recursion limit.
+        """
+        cursor = parent.walk()
+        if not cursor.goto_first_child():
+            return
+        get_handler = handlers.get
+        suspended = []
+        while True:
+            node = cursor.node
+            handler = get_handler(node.kind_id)
+            if handler is not None:
+                descend = handler(node, *context)
+                if descend is not None:
+                    subtree, sub_context = descend
+                    sub_cursor = subtree.walk()
+                    if sub_cursor.goto_first_child():
+                        suspended.append((cursor, context))
+                        cursor, context = sub_cursor, sub_context
+                        continue
+            elif cursor.goto_first_child():
+                continue
+            # Each cursor is rooted at its subtree, so goto_parent stops there
+            while not cursor.goto_next_sibling():
+                if cursor.goto_parent():
+                    continue
+                if not suspended:
+                    return
+                cursor, context = suspended.pop()
+    
+    def _call_matches(self, language, node):
+        """Call-site captures under node, in the order a pre-order walk visits them"""
+        # The cursor reports a match when it completes, which puts a call
+        # nested in another call's callee first; restore document order
+        matches = [captures for _, captures in self._call_cursors[language].matches(node)]
+        matches.sort(key=lambda m: (m['call'][0].start_byte, -m['call'][0].end_byte))
+        return matches
+    
+    def _assign_calls(self, language, root_node, source_code, filepath):
+        """
+        Fill .calls of the functions extracted from one file
+        
+        The extractors register each function's byte range in _call_owners.
+        One query pass over the file then hands every call site to the
+        innermost registered function around it, so a nested definition's
+        calls are not also credited to its enclosing function.
+        """
+        owners = self._call_owners
+        if not owners:
+            return
+        owners.sort(key=lambda owner: (owner[0], -owner[1]))
+        _, resolve = self._extractors[language]
+        
+        stack = []
+        next_owner = 0
+        for match in self._call_matches(language, root_node):
+            position = match['call'][0].start_byte
+            # Enter every function starting at or before this call...
+            while next_owner < len(owners) and owners[next_owner][0] <= position:
+                while stack and stack[-1][1] <= owners[next_owner][0]:
+                    stack.pop()
+                stack.append(owners[next_owner])
+                next_owner += 1
+            # ...and leave those that ended before it
+            while stack and stack[-1][1] <= position:
+                stack.pop()
+            if stack:
+                _, _, func_node, parent_class = stack[-1]
+                func_node.calls.append(resolve(match, source_code, parent_class, filepath))
+    
+    def _compile_ignore_patterns(self):
+        """Fold the ignore patterns into one regex (one C-level scan per path)"""
+        self._ignore_re = re.compile('|'.join(map(re.escape, sorted(self.ignore_patterns))))
+        # Without separators in any pattern, a match can't span a '/', so an
+        # entry of an already-cleared directory only needs its name checked
+        self._ignore_by_name = not any(
+            '/' in p or os.sep in p for p in self.ignore_patterns
+        )
     
     def should_ignore(self, path):
         """Check if path should be ignored"""
         basename = os.path.basename(path)
         
-        if basename in self.ignore_patterns:
+        if basename in self.ignore_patterns or self._ignore_re.search(path):
             return True
         
-        for pattern in self.ignore_patterns:
-            if pattern in path:
-                return True
-        
-        if basename.startswith('.') and basename != '.':
+        return basename.startswith('.') and basename != '.'
+    
+    def _name_ignored(self, name):
+        """should_ignore() for an entry whose parent directory path was already cleared"""
+        if name in self.ignore_patterns or self._ignore_re.search(name):
             return True
         
-        return False
+        return name.startswith('.') and name != '.'
     
     def scan_repository(self, repo_path):
-        """Scan entire repository"""
+        """
+        Scan entire repository
+        
+        With incremental=True, calling this again rescans the repository:
+        the previous results are replaced, and files are parsed in this
+        process starting from their trees of the last scan.
+        """
         print(f"\nScanning repository: {repo_path}\n")
         
-        for root, dirs, files in os.walk(repo_path):
-            dirs[:] = [d for d in dirs if not self.should_ignore(os.path.join(root, d))]
-            
-            for filename in files:
-                filepath = os.path.join(root, filename)
-                
-                if self.should_ignore(filepath):
-                    continue
-                
-                language = LanguageDetector.detect(filepath)
-                if not language or language not in self.parsers:
-                    continue
-                
-                rel_path = os.path.relpath(filepath, repo_path)
-                
-                try:
-                    print(f"  [{language:6}] Parsing: {rel_path}")
-                    self.scan_file(filepath, rel_path, language)
-                    self.file_count += 1
-                except Exception as e:
-                    print(f"    ✗ Error: {e}")
-                    self.error_count += 1
+        if self.incremental:
+            self._previous_trees, self._trees = self._trees, {}
+            self.nodes = []
+            self.node_map = {}
+            self.file_count = 0
+            self.error_count = 0
+        
+        work = self._collect_files(repo_path)
+        self._progress_time = time.monotonic()
+        
+        # Trees can't be handed between processes, so incremental scans parse serially
+        workers = 1 if self.incremental else self.max_workers or os.cpu_count() or 1
+        done = 0
+        if workers > 1 and len(work) >= PARALLEL_MIN_FILES:
+            # Files parse independently; results come back in walk order, so
+            # nodes and node_map end up exactly as in a serial scan
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=_worker_context(),
+                    initializer=_init_scan_worker,
+                    initargs=(type(self), self.ignore_patterns - self.DEFAULT_IGNORE, self.cache_dir)
+                ) as pool:
+                    chunksize = max(1, len(work) // (workers * 8))
+                    for nodes, error in pool.map(_scan_file_in_worker, work, chunksize=chunksize):
+                        self._merge_scan_result(work[done], nodes, error)
+                        done += 1
+                        self._report_progress(done, len(work))
+            except (OSError, BrokenProcessPool) as e:
+                print(f"  ⚠ Parallel scan unavailable ({e}); continuing serially")
+        
+        for filepath, rel_path, language in work[done:]:
+            try:
+                self.scan_file(filepath, rel_path, language)
+                self.file_count += 1
+            except Exception as e:
+                print(f"    ✗ Error in {rel_path}: {e}")
+                self.error_count += 1
+            done += 1
+            self._report_progress(done, len(work))
+        
+        # Spellings and trees are only shared while extracting; don't hold them after
+        self._text_cache = {}
+        self._tree_cache = {}
+        self._previous_trees = {}
         
         print(f"\n{'='*60}")
         print(f"✓ Successfully parsed: {self.file_count} files")
@@ -162,365 +611,552 @@ class MultiLanguageScanner:
         
         print("Building call graph...")
         self.build_call_graph()
+        self.build_file_index()
+        self.build_search_index()
+        
+        if self.cache_dir:
+            self._prune_parse_cache()
         
         return self.nodes
     
+    def _collect_files(self, repo_path):
+        """
+        List the files to parse as (filepath, rel_path, language), in the
+        same order os.walk would visit them
+        
+        Directories are listed concurrently by a thread pool; the listings
+        are then stitched together depth-first so the order is deterministic.
+        """
+        # Name-only checks are only safe while should_ignore is this class's
+        name_checks = (
+            self._ignore_by_name
+            and type(self).should_ignore is MultiLanguageScanner.should_ignore
+        )
+        
+        listings = {}
+        with ThreadPoolExecutor(max_workers=WALK_THREADS) as pool:
+            # The root itself is never checked, so its entries get full-path checks
+            pending = {pool.submit(self._list_directory, repo_path, repo_path, False): repo_path}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    files, subdirs = future.result()
+                    listings[path] = (files, subdirs)
+                    for subdir in subdirs:
+                        pending[pool.submit(self._list_directory, subdir, repo_path, name_checks)] = subdir
+        
+        work = []
+        stack = [repo_path]
+        while stack:
+            files, subdirs = listings[stack.pop()]
+            work.extend(files)
+            stack.extend(reversed(subdirs))
+        return work
+    
+    def _list_directory(self, dirpath, repo_path, name_checks):
+        """
+        One directory's parseable files and the subdirectories to descend into
+        
+        With name_checks, dirpath has already passed should_ignore(), so
+        entries are checked by name alone.
+        """
+        ignored = self._name_ignored if name_checks else None
+        files = []
+        subdirs = []
+        try:
+            entries = list(os.scandir(dirpath))
+        except OSError:
+            # os.walk skips unreadable directories too
+            return files, subdirs
+        
+        rel_dir = os.path.relpath(dirpath, repo_path)
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            
+            if ignored is not None:
+                skip = ignored(entry.name)
+            else:
+                skip = self.should_ignore(entry.path)
+            
+            if is_dir:
+                # Like os.walk, symlinked directories are not followed
+                if not skip and not entry.is_symlink():
+                    subdirs.append(entry.path)
+                continue
+            
+            if skip:
+                continue
+            
+            language = LanguageDetector.detect_name(entry.name)
+            if not language or language not in self.parsers:
+                continue
+            
+            rel_path = entry.name if rel_dir == '.' else os.path.join(rel_dir, entry.name)
+            files.append((entry.path, rel_path, language))
+        return files, subdirs
+    
+    def _merge_scan_result(self, item, nodes, error):
+        """Add one worker's parse result, logging it like a serial scan"""
+        rel_path = item[1]
+        self._adopt_nodes(nodes)
+        if error is None:
+            self.file_count += 1
+        else:
+            print(f"    ✗ Error in {rel_path}: {error}")
+            self.error_count += 1
+    
+    def _adopt_nodes(self, nodes):
+        """
+        Add nodes unpickled from a worker or the parse cache
+        
+        Unpickling makes fresh copies of the small-domain strings; interning
+        them again lets node_type/language/parent_class comparisons match by
+        identity, as they do for nodes extracted in this process.
+        """
+        intern = sys.intern
+        node_map = self.node_map
+        for node in nodes:
+            node.node_type = intern(node.node_type)
+            node.language = intern(node.language)
+            if node.parent_class is not None:
+                node.parent_class = intern(node.parent_class)
+            node_map[node.full_path] = node
+        self.nodes.extend(nodes)
+    
+    def _report_progress(self, done, total):
+        """Print a progress line every PROGRESS_EVERY_FILES files or PROGRESS_INTERVAL seconds"""
+        now = time.monotonic()
+        if (done < total and done % PROGRESS_EVERY_FILES
+                and now - self._progress_time < PROGRESS_INTERVAL):
+            return
+        self._progress_time = now
+        print(f"  Parsed {done}/{total} files", flush=done == total)
+    
     def scan_file(self, filepath, rel_path, language):
         """Scan a single file"""
-        with open(filepath, 'rb') as f:
-            source_code = f.read()
+        source_code = _read_source(filepath)
+        try:
+            self._scan_source(source_code, rel_path, language)
+        finally:
+            if isinstance(source_code, mmap.mmap):
+                source_code.close()
+    
+    def _parse(self, language, source_code, rel_path):
+        """
+        Parse a file, reusing the tree of an identical file seen recently
+        
+        Vendored copies and duplicated headers produce the same tree, and
+        the extractors only read it with byte offsets that are equally valid
+        for every copy. The cache is a small LRU keyed by content digest.
+        """
+        if self.incremental:
+            return self._parse_incremental(language, source_code, rel_path)
+        
+        key = (language, hashlib.blake2b(source_code, digest_size=16).digest())
+        trees = self._tree_cache
+        tree = trees.pop(key, None)
+        if tree is None:
+            tree = self.parsers[language].parse(source_code)
+            if len(trees) >= TREE_CACHE_MAX:
+                del trees[next(iter(trees))]
+        # (Re)inserted last: dict order doubles as recency order
+        trees[key] = tree
+        return tree
+    
+    def _parse_incremental(self, language, source_code, rel_path):
+        """
+        Parse a file starting from its tree of the previous scan
+        
+        The changed byte range is applied to the old tree with Tree.edit,
+        so tree-sitter reuses every subtree outside it; an unchanged file
+        keeps its tree as is. The extractors still walk the whole tree.
+        """
+        # The tree outlives this scan's mmap, so keep the contents as bytes
+        source = bytes(source_code)
+        previous = self._previous_trees.get(rel_path)
+        if previous is None:
+            tree = self.parsers[language].parse(source)
+        else:
+            old_source, tree = previous
+            if old_source != source:
+                start, old_end, new_end = _changed_span(old_source, source)
+                tree.edit(
+                    start_byte=start,
+                    old_end_byte=old_end,
+                    new_end_byte=new_end,
+                    start_point=_point_at(source, start),
+                    old_end_point=_point_at(old_source, old_end),
+                    new_end_point=_point_at(source, new_end),
+                )
+                tree = self.parsers[language].parse(source, tree)
+        self._trees[rel_path] = (source, tree)
+        return tree
+    
+    def _scan_source(self, source_code, rel_path, language):
+        """Extract the nodes of one file's contents (bytes or a read-only mmap)"""
+        markers = self.PRESCREEN_MARKERS.get(language)
+        # find() rather than `in`: mmap containment only tests single bytes
+        if markers and not any(source_code.find(marker) != -1 for marker in markers):
+            return
+        
+        cache_key = None
+        if self.cache_dir:
+            cache_key = self._parse_cache_key(source_code, rel_path, language)
+            if self._load_cached_nodes(cache_key):
+                return
         
-        tree = self.parsers[language].parse(source_code)
+        first_node = len(self.nodes)
+        tree = self._parse(language, source_code, rel_path)
         
         # Route to language-specific extractor
-        if language == 'python':
-            self._extract_python(tree.root_node, source_code, rel_path)
-        elif language == 'java':
-            self._extract_java(tree.root_node, source_code, rel_path)
-        elif language == 'c':
-            self._extract_c(tree.root_node, source_code, rel_path)
-        elif language == 'cpp':
-            self._extract_cpp(tree.root_node, source_code, rel_path)
+        extract, _ = self._extractors[language]
+        try:
+            extract(tree.root_node, source_code, rel_path)
+            self._assign_calls(language, tree.root_node, source_code, rel_path)
+        finally:
+            self._call_owners = []
+            self._target_cache = {}
+        
+        if cache_key:
+            self._store_cached_nodes(cache_key, self.nodes[first_node:])
+    
+    # ==================== PARSE CACHE ====================
+    
+    @staticmethod
+    def _parse_cache_key(source_code, rel_path, language):
+        """Content hash of a file; the path is included because node ids embed it"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{PARSE_CACHE_VERSION}\0{language}\0{rel_path}\0".encode())
+        h.update(source_code)
+        return h.hexdigest()
+    
+    def _parse_cache_path(self, cache_key):
+        return os.path.join(self.cache_dir, f"{cache_key}.pkl")
+    
+    def _load_cached_nodes(self, cache_key):
+        """
+        Add a file's previously extracted nodes from the parse cache
+        
+        Returns:
+            True on a cache hit, False if the file has to be parsed
+        """
+        path = self._parse_cache_path(cache_key)
+        try:
+            with open(path, 'rb') as f:
+                nodes = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception:
+            # Truncated or stale entry; parsing again overwrites it
+            return False
+        
+        self._adopt_nodes(nodes)
+        
+        try:
+            # Mark as recently used for _prune_parse_cache
+            os.utime(path)
+        except OSError:
+            pass
+        return True
+    
+    def _store_cached_nodes(self, cache_key, nodes):
+        """Write a file's extracted nodes to the parse cache (best effort)"""
+        path = self._parse_cache_path(cache_key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(nodes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def _prune_parse_cache(self, max_files=PARSE_CACHE_MAX_FILES):
+        """Drop the least recently used parse cache entries beyond max_files"""
+        try:
+            with os.scandir(self.cache_dir) as it:
+                entries = [
+                    (entry.stat().st_mtime, entry.path)
+                    for entry in it if entry.name.endswith('.pkl')
+                ]
+        except OSError:
+            return
+        
+        if len(entries) <= max_files:
+            return
+        
+        entries.sort()
+        for _, path in entries[:len(entries) - max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
     
     # ==================== PYTHON EXTRACTOR ====================
     
     def _extract_python(self, root_node, source_code, filepath):
         """Extract nodes from Python code"""
         
-        def walk(node, parent_class=None):
-            if node.type == 'class_definition':
-                name_node = node.child_by_field_name('name')
-                if not name_node:
-                    return
-                
-                class_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-                
-                class_node = SemanticNode(
-                    name=class_name,
-                    node_type='class',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='python'
-                )
-                class_node.qualified_name = class_name
-                class_node.full_path = f"{filepath}::{class_name}"
-                
-                self.nodes.append(class_node)
-                self.node_map[class_node.full_path] = class_node
-                
-                for child in node.children:
-                    walk(child, parent_class=class_name)
-            
-            elif node.type == 'function_definition':
-                name_node = node.child_by_field_name('name')
-                if not name_node:
-                    return
-                
-                func_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-                
-                func_node = SemanticNode(
-                    name=func_name,
-                    node_type='method' if parent_class else 'function',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='python'
-                )
-                
-                if parent_class:
-                    func_node.parent_class = parent_class
-                    func_node.qualified_name = f"{parent_class}.{func_name}"
-                    func_node.full_path = f"{filepath}::{parent_class}.{func_name}"
-                else:
-                    func_node.qualified_name = func_name
-                    func_node.full_path = f"{filepath}::{func_name}"
-                
-                # Extract parameters
-                params_node = node.child_by_field_name('parameters')
-                if params_node:
-                    for child in params_node.children:
-                        if child.type == 'identifier':
-                            param = source_code[child.start_byte:child.end_byte].decode()
-                            func_node.parameters.append(param)
-                
-                # Find calls
-                func_node.calls = self._find_calls_python(node, source_code, parent_class, filepath)
-                
-                self.nodes.append(func_node)
-                self.node_map[func_node.full_path] = func_node
+        def visit_class(node, parent_class):
+            name_node = node.child_by_field_name('name')
+            if not name_node:
+                return
+            
+            class_name = self._text(source_code, name_node)
+            
+            class_node = SemanticNode(
+                name=class_name,
+                node_type='class',
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+                filepath=filepath,
+                language='python'
+            )
+            class_node.qualified_name = class_name
+            class_node.full_path = sys.intern(f"{filepath}::{class_name}")
+            
+            self.nodes.append(class_node)
+            self.node_map[class_node.full_path] = class_node
+            
+            return node, (class_name,)
+        
+        def visit_function(node, parent_class):
+            name_node = node.child_by_field_name('name')
+            if not name_node:
+                return
+            
+            func_name = self._text(source_code, name_node)
             
+            func_node = SemanticNode(
+                name=func_name,
+                node_type='method' if parent_class else 'function',
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+                filepath=filepath,
+                language='python'
+            )
+            
+            if parent_class:
+                func_node.parent_class = parent_class
+                func_node.qualified_name = f"{parent_class}.{func_name}"
+                func_node.full_path = sys.intern(f"{filepath}::{func_node.qualified_name}")
             else:
-                for child in node.children:
-                    walk(child, parent_class=parent_class)
-        
-        walk(root_node)
-    
-    def _find_calls_python(self, func_node, source_code, parent_class, filepath):
-        """Find function calls in Python"""
-        calls = []
-        
-        def walk(node):
-            if node.type == 'call':
-                func_name_node = node.child_by_field_name('function')
-                
-                if func_name_node:
-                    if func_name_node.type == 'identifier':
-                        called_name = source_code[func_name_node.start_byte:func_name_node.end_byte].decode()
-                        qualified = f"{filepath}::{called_name}"
-                        calls.append(qualified)
-                    
-                    elif func_name_node.type == 'attribute':
-                        obj_node = func_name_node.child_by_field_name('object')
-                        attr_node = func_name_node.child_by_field_name('attribute')
-                        
-                        if obj_node and attr_node:
-                            obj_name = source_code[obj_node.start_byte:obj_node.end_byte].decode()
-                            method_name = source_code[attr_node.start_byte:attr_node.end_byte].decode()
-                            
-                            if obj_name == 'self' and parent_class:
-                                qualified = f"{filepath}::{parent_class}.{method_name}"
-                            elif obj_name == parent_class:
-                                qualified = f"{filepath}::{parent_class}.{method_name}"
-                            else:
-                                qualified = f"{filepath}::{obj_name}.{method_name}"
-                            calls.append(qualified)
-            
-            for child in node.children:
-                walk(child)
-        
-        walk(func_node)
-        return calls
+                func_node.qualified_name = func_name
+                func_node.full_path = sys.intern(f"{filepath}::{func_name}")
+            
+            # Extract parameters
+            params_node = node.child_by_field_name('parameters')
+            if params_node:
+                func_node.parameters = tuple(
+                    self._text(source_code, child)
+                    for child in params_node.children
+                    if child.type == 'identifier'
+                )
+            
+            # Find calls
+            self._call_owners.append((node.start_byte, node.end_byte, func_node, parent_class))
+            
+            self.nodes.append(func_node)
+            self.node_map[func_node.full_path] = func_node
+        
+        # One dict lookup per node instead of a chain of type comparisons
+        handlers = dict.fromkeys(self.OPAQUE_NODES['python'], self._skip_subtree)
+        handlers['class_definition'] = visit_class
+        handlers['function_definition'] = visit_function
+        
+        self._walk_children(root_node, self._dispatch_table('python', handlers), None)
     
+    def _resolve_call_python(self, match, source_code, parent_class, filepath):
+        """Qualified target of a Python call site"""
+        if 'id' in match:
+            id_node = match['id'][0]
+            called_name = self._text(source_code, id_node)
+            return self._call_target(filepath, None, called_name)
+        
+        obj_node = match['obj'][0]
+        attr_node = match['attr'][0]
+        obj_name = self._text(source_code, obj_node)
+        method_name = self._text(source_code, attr_node)
+        
+        if obj_name == 'self' and parent_class:
+            return self._call_target(filepath, parent_class, method_name)
+        elif obj_name == parent_class:
+            return self._call_target(filepath, parent_class, method_name)
+        return self._call_target(filepath, obj_name, method_name)
+    
+
     # ==================== JAVA EXTRACTOR (ENHANCED) ====================
     
     def _extract_java(self, root_node, source_code, filepath):
         """Extract nodes from Java code - WITH ENUM AND INTERFACE SUPPORT"""
         
-        def walk(node, parent_class=None):
-            # Java class: class_declaration
-            if node.type == 'class_declaration':
-                name_node = node.child_by_field_name('name')
-                if not name_node:
-                    return
-                
-                class_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-                
-                class_node = SemanticNode(
-                    name=class_name,
-                    node_type='class',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='java'
-                )
-                class_node.qualified_name = class_name
-                class_node.full_path = f"{filepath}::{class_name}"
-                
-                self.nodes.append(class_node)
-                self.node_map[class_node.full_path] = class_node
-                
-                # Walk class body
-                body = node.child_by_field_name('body')
-                if body:
-                    for child in body.children:
-                        walk(child, parent_class=class_name)
-            
-            # Java enum: enum_declaration (NEW!)
-            elif node.type == 'enum_declaration':
-                name_node = node.child_by_field_name('name')
-                if not name_node:
-                    return
-                
-                enum_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-                
-                enum_node = SemanticNode(
-                    name=enum_name,
-                    node_type='enum',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='java'
-                )
-                enum_node.qualified_name = enum_name
-                enum_node.full_path = f"{filepath}::{enum_name}"
-                
-                self.nodes.append(enum_node)
-                self.node_map[enum_node.full_path] = enum_node
-                
-                # Walk enum body (enums can have methods too!)
-                body = node.child_by_field_name('body')
-                if body:
-                    for child in body.children:
-                        walk(child, parent_class=enum_name)
-            
-            # Java interface: interface_declaration (NEW!)
-            elif node.type == 'interface_declaration':
-                name_node = node.child_by_field_name('name')
-                if not name_node:
-                    return
-                
-                interface_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-                
-                interface_node = SemanticNode(
-                    name=interface_name,
-                    node_type='interface',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='java'
-                )
-                interface_node.qualified_name = interface_name
-                interface_node.full_path = f"{filepath}::{interface_name}"
-                
-                self.nodes.append(interface_node)
-                self.node_map[interface_node.full_path] = interface_node
-                
-                # Walk interface body
-                body = node.child_by_field_name('body')
-                if body:
-                    for child in body.children:
-                        walk(child, parent_class=interface_name)
-            
-            # Java method: method_declaration
-            elif node.type == 'method_declaration':
-                name_node = node.child_by_field_name('name')
-                if not name_node:
-                    return
-                
-                method_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-                
-                method_node = SemanticNode(
-                    name=method_name,
-                    node_type='method' if parent_class else 'function',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='java'
-                )
-                
-                if parent_class:
-                    method_node.parent_class = parent_class
-                    method_node.qualified_name = f"{parent_class}.{method_name}"
-                    method_node.full_path = f"{filepath}::{parent_class}.{method_name}"
-                else:
-                    method_node.qualified_name = method_name
-                    method_node.full_path = f"{filepath}::{method_name}"
-                
-                # Extract parameters
-                params_node = node.child_by_field_name('parameters')
-                if params_node:
-                    for child in params_node.children:
-                        if child.type == 'formal_parameter':
-                            param_name_node = child.child_by_field_name('name')
-                            if param_name_node:
-                                param = source_code[param_name_node.start_byte:param_name_node.end_byte].decode()
-                                method_node.parameters.append(param)
-                
-                # Extract return type
-                type_node = node.child_by_field_name('type')
-                if type_node:
-                    return_type = source_code[type_node.start_byte:type_node.end_byte].decode()
-                    method_node.return_type = return_type
-                
-                # Find calls
-                method_node.calls = self._find_calls_java(node, source_code, parent_class, filepath)
-                
-                self.nodes.append(method_node)
-                self.node_map[method_node.full_path] = method_node
+        # Java classes, enums and interfaces produce the same node shape and
+        # all walk their body with themselves as the parent
+        type_kinds = {
+            'class_declaration': 'class',
+            'enum_declaration': 'enum',
+            'interface_declaration': 'interface',
+        }
+        
+        def visit_type(node, parent_class):
+            name_node = node.child_by_field_name('name')
+            if not name_node:
+                return
+            
+            type_name = self._text(source_code, name_node)
             
+            type_node = SemanticNode(
+                name=type_name,
+                node_type=type_kinds[node.type],
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+                filepath=filepath,
+                language='java'
+            )
+            type_node.qualified_name = type_name
+            type_node.full_path = sys.intern(f"{filepath}::{type_name}")
+            
+            self.nodes.append(type_node)
+            self.node_map[type_node.full_path] = type_node
+            
+            # Walk body (enums and interfaces can have methods too!)
+            body = node.child_by_field_name('body')
+            if body:
+                return body, (type_name,)
+        
+        def visit_method(node, parent_class):
+            name_node = node.child_by_field_name('name')
+            if not name_node:
+                return
+            
+            method_name = self._text(source_code, name_node)
+            
+            method_node = SemanticNode(
+                name=method_name,
+                node_type='method' if parent_class else 'function',
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+                filepath=filepath,
+                language='java'
+            )
+            
+            if parent_class:
+                method_node.parent_class = parent_class
+                method_node.qualified_name = f"{parent_class}.{method_name}"
+                method_node.full_path = sys.intern(f"{filepath}::{method_node.qualified_name}")
             else:
-                for child in node.children:
-                    walk(child, parent_class=parent_class)
-        
-        walk(root_node)
-    
-    def _find_calls_java(self, func_node, source_code, parent_class, filepath):
-        """Find method calls in Java"""
-        calls = []
-        
-        def walk(node):
-            if node.type == 'method_invocation':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    method_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-                    
-                    object_node = node.child_by_field_name('object')
-                    if object_node:
-                        obj_name = source_code[object_node.start_byte:object_node.end_byte].decode()
-                        if obj_name == 'this' and parent_class:
-                            qualified = f"{filepath}::{parent_class}.{method_name}"
-                        elif obj_name == parent_class:
-                            qualified = f"{filepath}::{parent_class}.{method_name}"
-                        else:
-                            qualified = f"{filepath}::{obj_name}.{method_name}"
-                    else:
-                        if parent_class:
-                            qualified = f"{filepath}::{parent_class}.{method_name}"
-                        else:
-                            qualified = f"{filepath}::{method_name}"
-                    
-                    calls.append(qualified)
-            
-            for child in node.children:
-                walk(child)
-        
-        walk(func_node)
-        return calls
+                method_node.qualified_name = method_name
+                method_node.full_path = sys.intern(f"{filepath}::{method_name}")
+            
+            # Extract parameters
+            params_node = node.child_by_field_name('parameters')
+            if params_node:
+                params = []
+                for child in params_node.children:
+                    if child.type == 'formal_parameter':
+                        param_name_node = child.child_by_field_name('name')
+                        if param_name_node:
+                            param = self._text(source_code, param_name_node)
+                            params.append(param)
+                method_node.parameters = tuple(params)
+            
+            # Extract return type
+            type_node = node.child_by_field_name('type')
+            if type_node:
+                return_type = self._text(source_code, type_node)
+                method_node.return_type = return_type
+            
+            # Find calls
+            self._call_owners.append((node.start_byte, node.end_byte, method_node, parent_class))
+            
+            self.nodes.append(method_node)
+            self.node_map[method_node.full_path] = method_node
+        
+        handlers = dict.fromkeys(self.OPAQUE_NODES['java'], self._skip_subtree)
+        handlers.update(dict.fromkeys(type_kinds, visit_type))
+        handlers['method_declaration'] = visit_method
+        
+        self._walk_children(root_node, self._dispatch_table('java', handlers), None)
+    
+    def _resolve_call_java(self, match, source_code, parent_class, filepath):
+        """Qualified target of a Java method invocation"""
+        name_node = match['name'][0]
+        method_name = self._text(source_code, name_node)
+        
+        if 'obj' in match:
+            object_node = match['obj'][0]
+            obj_name = self._text(source_code, object_node)
+            if obj_name == 'this' and parent_class:
+                return self._call_target(filepath, parent_class, method_name)
+            elif obj_name == parent_class:
+                return self._call_target(filepath, parent_class, method_name)
+            return self._call_target(filepath, obj_name, method_name)
+        
+        if parent_class:
+            return self._call_target(filepath, parent_class, method_name)
+        return self._call_target(filepath, None, method_name)
     
     # ==================== C EXTRACTOR ====================
     
     def _extract_c(self, root_node, source_code, filepath):
         """Extract nodes from C code"""
         
-        def walk(node):
-            if node.type == 'function_definition':
-                declarator = node.child_by_field_name('declarator')
-                if not declarator:
-                    return
-                
-                func_name = self._get_c_function_name(declarator, source_code)
-                if not func_name:
-                    return
-                
-                func_node = SemanticNode(
-                    name=func_name,
-                    node_type='function',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='c'
-                )
-                
-                func_node.qualified_name = func_name
-                func_node.full_path = f"{filepath}::{func_name}"
-                
-                params = self._get_c_parameters(declarator, source_code)
-                func_node.parameters = params
-                
-                type_node = node.child_by_field_name('type')
-                if type_node:
-                    return_type = source_code[type_node.start_byte:type_node.end_byte].decode()
-                    func_node.return_type = return_type
-                
-                func_node.calls = self._find_calls_c(node, source_code, filepath)
-                
-                self.nodes.append(func_node)
-                self.node_map[func_node.full_path] = func_node
-            
-            for child in node.children:
-                walk(child)
-        
-        walk(root_node)
+        def visit_function(node):
+            declarator = node.child_by_field_name('declarator')
+            if not declarator:
+                return
+            
+            func_name = self._get_c_function_name(declarator, source_code)
+            if not func_name:
+                return
+            
+            func_node = SemanticNode(
+                name=func_name,
+                node_type='function',
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+                filepath=filepath,
+                language='c'
+            )
+            
+            func_node.qualified_name = func_name
+            func_node.full_path = sys.intern(f"{filepath}::{func_name}")
+            
+            params = self._get_c_parameters(declarator, source_code)
+            func_node.parameters = tuple(params)
+            
+            type_node = node.child_by_field_name('type')
+            if type_node:
+                return_type = self._text(source_code, type_node)
+                func_node.return_type = return_type
+            
+            self._call_owners.append((node.start_byte, node.end_byte, func_node, None))
+            
+            self.nodes.append(func_node)
+            self.node_map[func_node.full_path] = func_node
+            
+            # Keep searching the body: GNU C allows nested functions
+            return node, ()
+        
+        handlers = dict.fromkeys(self.OPAQUE_NODES['c'], self._skip_subtree)
+        handlers['function_definition'] = visit_function
+        self._walk_children(root_node, self._dispatch_table('c', handlers))
     
     def _get_c_function_name(self, declarator, source_code):
         """Extract function name from C declarator"""
         if declarator.type == 'function_declarator':
             inner = declarator.child_by_field_name('declarator')
             if inner and inner.type == 'identifier':
-                return source_code[inner.start_byte:inner.end_byte].decode()
+                return self._text(source_code, inner)
         elif declarator.type == 'identifier':
-            return source_code[declarator.start_byte:declarator.end_byte].decode()
+            return self._text(source_code, declarator)
         return None
     
     def _get_c_parameters(self, declarator, source_code):
@@ -533,104 +1169,90 @@ class MultiLanguageScanner:
                     if child.type == 'parameter_declaration':
                         decl = child.child_by_field_name('declarator')
                         if decl and decl.type == 'identifier':
-                            param = source_code[decl.start_byte:decl.end_byte].decode()
+                            param = self._text(source_code, decl)
                             params.append(param)
         return params
     
-    def _find_calls_c(self, func_node, source_code, filepath):
-        """Find function calls in C"""
-        calls = []
-        
-        def walk(node):
-            if node.type == 'call_expression':
-                func = node.child_by_field_name('function')
-                if func and func.type == 'identifier':
-                    func_name = source_code[func.start_byte:func.end_byte].decode()
-                    qualified = f"{filepath}::{func_name}"
-                    calls.append(qualified)
-            
-            for child in node.children:
-                walk(child)
-        
-        walk(func_node)
-        return calls
+    def _resolve_call_c(self, match, source_code, parent_class, filepath):
+        """Qualified target of a C function call"""
+        func = match['id'][0]
+        func_name = self._text(source_code, func)
+        return self._call_target(filepath, None, func_name)
     
     # ==================== C++ EXTRACTOR ====================
     
     def _extract_cpp(self, root_node, source_code, filepath):
         """Extract nodes from C++ code"""
         
-        def walk(node, parent_class=None, namespace=None):
-            if node.type == 'class_specifier':
-                name_node = node.child_by_field_name('name')
-                if not name_node:
-                    return
-                
-                class_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-                
-                class_node = SemanticNode(
-                    name=class_name,
-                    node_type='class',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='cpp'
-                )
-                class_node.qualified_name = class_name
-                class_node.full_path = f"{filepath}::{class_name}"
-                
-                self.nodes.append(class_node)
-                self.node_map[class_node.full_path] = class_node
-                
-                body = node.child_by_field_name('body')
-                if body:
-                    for child in body.children:
-                        walk(child, parent_class=class_name, namespace=namespace)
-            
-            elif node.type == 'function_definition':
-                declarator = node.child_by_field_name('declarator')
-                if not declarator:
-                    return
-                
-                func_name = self._get_cpp_function_name(declarator, source_code)
-                if not func_name:
-                    return
-                
-                func_node = SemanticNode(
-                    name=func_name,
-                    node_type='method' if parent_class else 'function',
-                    start_line=node.start_point[0] + 1,
-                    end_line=node.end_point[0] + 1,
-                    filepath=filepath,
-                    language='cpp'
-                )
-                
-                if parent_class:
-                    func_node.parent_class = parent_class
-                    func_node.qualified_name = f"{parent_class}.{func_name}"
-                    func_node.full_path = f"{filepath}::{parent_class}.{func_name}"
-                else:
-                    func_node.qualified_name = func_name
-                    func_node.full_path = f"{filepath}::{func_name}"
-                
-                params = self._get_cpp_parameters(declarator, source_code)
-                func_node.parameters = params
-                
-                type_node = node.child_by_field_name('type')
-                if type_node:
-                    return_type = source_code[type_node.start_byte:type_node.end_byte].decode()
-                    func_node.return_type = return_type
-                
-                func_node.calls = self._find_calls_cpp(node, source_code, parent_class, filepath)
-                
-                self.nodes.append(func_node)
-                self.node_map[func_node.full_path] = func_node
+        def visit_class(node, parent_class, namespace):
+            name_node = node.child_by_field_name('name')
+            if not name_node:
+                return
             
+            class_name = self._text(source_code, name_node)
+            
+            class_node = SemanticNode(
+                name=class_name,
+                node_type='class',
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+                filepath=filepath,
+                language='cpp'
+            )
+            class_node.qualified_name = class_name
+            class_node.full_path = sys.intern(f"{filepath}::{class_name}")
+            
+            self.nodes.append(class_node)
+            self.node_map[class_node.full_path] = class_node
+            
+            body = node.child_by_field_name('body')
+            if body:
+                return body, (class_name, namespace)
+        
+        def visit_function(node, parent_class, namespace):
+            declarator = node.child_by_field_name('declarator')
+            if not declarator:
+                return
+            
+            func_name = self._get_cpp_function_name(declarator, source_code)
+            if not func_name:
+                return
+            
+            func_node = SemanticNode(
+                name=func_name,
+                node_type='method' if parent_class else 'function',
+                start_line=node.start_point[0] + 1,
+                end_line=node.end_point[0] + 1,
+                filepath=filepath,
+                language='cpp'
+            )
+            
+            if parent_class:
+                func_node.parent_class = parent_class
+                func_node.qualified_name = f"{parent_class}.{func_name}"
+                func_node.full_path = sys.intern(f"{filepath}::{func_node.qualified_name}")
             else:
-                for child in node.children:
-                    walk(child, parent_class=parent_class, namespace=namespace)
+                func_node.qualified_name = func_name
+                func_node.full_path = sys.intern(f"{filepath}::{func_name}")
+            
+            params = self._get_cpp_parameters(declarator, source_code)
+            func_node.parameters = tuple(params)
+            
+            type_node = node.child_by_field_name('type')
+            if type_node:
+                return_type = self._text(source_code, type_node)
+                func_node.return_type = return_type
+            
+            self._call_owners.append((node.start_byte, node.end_byte, func_node, parent_class))
+            
+            self.nodes.append(func_node)
+            self.node_map[func_node.full_path] = func_node
         
-        walk(root_node)
+        handlers = dict.fromkeys(self.OPAQUE_NODES['cpp'], self._skip_subtree)
+        handlers['class_specifier'] = visit_class
+        handlers['function_definition'] = visit_function
+        
+        self._walk_children(root_node, self._dispatch_table('cpp', handlers), None, None)
     
     def _get_cpp_function_name(self, declarator, source_code):
         """Extract function name from C++ declarator"""
@@ -638,11 +1260,11 @@ class MultiLanguageScanner:
             inner = declarator.child_by_field_name('declarator')
             if inner:
                 if inner.type == 'identifier':
-                    return source_code[inner.start_byte:inner.end_byte].decode()
+                    return self._text(source_code, inner)
                 elif inner.type == 'field_identifier':
-                    return source_code[inner.start_byte:inner.end_byte].decode()
+                    return self._text(source_code, inner)
         elif declarator.type == 'identifier':
-            return source_code[declarator.start_byte:declarator.end_byte].decode()
+            return self._text(source_code, declarator)
         return None
     
     def _get_cpp_parameters(self, declarator, source_code):
@@ -656,76 +1278,122 @@ class MultiLanguageScanner:
                         decl = child.child_by_field_name('declarator')
                         if decl:
                             if decl.type == 'identifier':
-                                param = source_code[decl.start_byte:decl.end_byte].decode()
+                                param = self._text(source_code, decl)
                                 params.append(param)
         return params
     
-    def _find_calls_cpp(self, func_node, source_code, parent_class, filepath):
-        """Find function calls in C++"""
-        calls = []
-        
-        def walk(node):
-            if node.type == 'call_expression':
-                func = node.child_by_field_name('function')
-                if func:
-                    if func.type == 'identifier':
-                        func_name = source_code[func.start_byte:func.end_byte].decode()
-                        if parent_class:
-                            qualified = f"{filepath}::{parent_class}.{func_name}"
-                        else:
-                            qualified = f"{filepath}::{func_name}"
-                        calls.append(qualified)
-                    elif func.type == 'field_expression':
-                        field = func.child_by_field_name('field')
-                        if field:
-                            method_name = source_code[field.start_byte:field.end_byte].decode()
-                            obj = func.child_by_field_name('argument')
-                            if obj:
-                                obj_name = source_code[obj.start_byte:obj.end_byte].decode()
-                                if obj_name == 'this' and parent_class:
-                                    qualified = f"{filepath}::{parent_class}.{method_name}"
-                                else:
-                                    qualified = f"{filepath}::{obj_name}.{method_name}"
-                                calls.append(qualified)
-            
-            for child in node.children:
-                walk(child)
-        
-        walk(func_node)
-        return calls
+    def _resolve_call_cpp(self, match, source_code, parent_class, filepath):
+        """Qualified target of a C++ function or method call"""
+        if 'id' in match:
+            func = match['id'][0]
+            func_name = self._text(source_code, func)
+            if parent_class:
+                return self._call_target(filepath, parent_class, func_name)
+            return self._call_target(filepath, None, func_name)
+        
+        field = match['field'][0]
+        method_name = self._text(source_code, field)
+        obj = match['obj'][0]
+        obj_name = self._text(source_code, obj)
+        if obj_name == 'this' and parent_class:
+            return self._call_target(filepath, parent_class, method_name)
+        return self._call_target(filepath, obj_name, method_name)
     
     # ==================== COMMON METHODS ====================
     
     def build_call_graph(self):
         """Build called_by relationships"""
+        node_map = self.node_map
+        callers_by_path = defaultdict(list)
         for node in self.nodes:
+            full_path = node.full_path
             for called_path in node.calls:
-                if called_path in self.node_map:
-                    target_node = self.node_map[called_path]
-                    target_node.called_by.append(node.full_path)
+                if called_path in node_map:
+                    callers_by_path[called_path].append(full_path)
+        
+        for called_path, callers in callers_by_path.items():
+            node_map[called_path].called_by = callers
+        
+        # Call-count rankings in the search index are stale now
+        self._indexed_nodes = None
     
-    def get_statistics(self):
-        """Get repository statistics"""
-        stats = {
-            'total_files': self.file_count,
-            'total_classes': len([n for n in self.nodes if n.node_type == 'class']),
-            'total_enums': len([n for n in self.nodes if n.node_type == 'enum']),
-            'total_interfaces': len([n for n in self.nodes if n.node_type == 'interface']),
-            'total_functions': len([n for n in self.nodes if n.node_type == 'function']),
-            'total_methods': len([n for n in self.nodes if n.node_type == 'method']),
-            'by_language': defaultdict(lambda: {'classes': 0, 'enums': 0, 'interfaces': 0, 'functions': 0, 'methods': 0}),
-            'files': defaultdict(lambda: {'classes': 0, 'enums': 0, 'interfaces': 0, 'functions': 0, 'methods': 0})
-        }
+    def build_file_index(self):
+        """Group function/method nodes by filepath, sorted by start line"""
+        fns_by_file = defaultdict(list)
+        for node in self.nodes:
+            if node.node_type in _FUNCTION_KINDS:
+                fns_by_file[node.filepath].append(node)
         
+        for nodes in fns_by_file.values():
+            nodes.sort(key=lambda n: n.start_line)
+        self.fns_by_file = dict(fns_by_file)
+    
+    def build_search_index(self):
+        """Index functions and types by name and methods by parent class for the lookup helpers"""
+        functions_by_name = defaultdict(list)
+        types_by_name = defaultdict(list)
+        methods_by_class = defaultdict(list)
+        types = []
         for node in self.nodes:
-            lang = node.language
             node_type = node.node_type
-            
-            if node_type in ['class', 'enum', 'interface', 'function', 'method']:
-                stats['by_language'][lang][f"{node_type}s" if node_type != 'class' else 'classes'] += 1
-                stats['files'][node.filepath][f"{node_type}s" if node_type != 'class' else 'classes'] += 1
+            if node_type in _FUNCTION_KINDS:
+                functions_by_name[node.name].append(node)
+                if node_type == 'method':
+                    methods_by_class[node.parent_class].append(node)
+            elif node_type in _TYPE_KINDS:
+                types_by_name[node.name].append(node)
+                types.append(node)
+        
+        self._functions_by_name = dict(functions_by_name)
+        self._types_by_name = dict(types_by_name)
+        self._types = types
+        # Both orderings print_type_details shows, sorted once per class
+        # (nlargest keeps scan order among ties, like the stable sort did)
+        self._methods_by_class = {
+            class_name: sorted(methods, key=lambda m: m.start_line)
+            for class_name, methods in methods_by_class.items()
+        }
+        self._most_called_by_class = {
+            class_name: heapq.nlargest(5, methods, key=lambda m: len(m.called_by))
+            for class_name, methods in methods_by_class.items()
+        }
+        self._indexed_nodes = (id(self.nodes), len(self.nodes))
+    
+    def _ensure_search_index(self):
+        """Rebuild the search index if nodes were replaced or added since"""
+        if self._indexed_nodes != (id(self.nodes), len(self.nodes)):
+            self.build_search_index()
+    
+    def get_statistics(self):
+        """Get repository statistics"""
+        def empty_counts():
+            return {'classes': 0, 'enums': 0, 'interfaces': 0, 'functions': 0, 'methods': 0}
         
-        return stats
+        by_language = defaultdict(empty_counts)
+        files = defaultdict(empty_counts)
+        totals = dict.fromkeys(self.STAT_KEYS.values(), 0)
+        
+        # Count each (language, file, type) combination in one pass, then
+        # fold the far smaller set of distinct keys into the tables
+        counts = Counter((node.language, node.filepath, node.node_type) for node in self.nodes)
+        for (lang, filepath, node_type), count in counts.items():
+            key = self.STAT_KEYS.get(node_type)
+            if key is None:
+                continue
+            totals[key] += count
+            by_language[lang][key] += count
+            files[filepath][key] += count
+        
+        return {
+            'total_files': self.file_count,
+            'total_classes': totals['classes'],
+            'total_enums': totals['enums'],
+            'total_interfaces': totals['interfaces'],
+            'total_functions': totals['functions'],
+            'total_methods': totals['methods'],
+            'by_language': by_language,
+            'files': files
+        }
     
     def print_summary(self):
         """Print a summary of the scan"""
@@ -765,119 +1433,145 @@ class MultiLanguageScanner:
     
     def search_function(self, func_name):
         """Search for functions by name"""
-        results = []
-        for node in self.nodes:
-            if node.name == func_name and node.node_type in ['function', 'method']:
-                results.append(node)
-        return results
+        self._ensure_search_index()
+        return list(self._functions_by_name.get(func_name, ()))
     
     def search_type(self, type_name):
         """Search for classes, enums, or interfaces by name"""
-        results = []
-        for node in self.nodes:
-            if node.name == type_name and node.node_type in ['class', 'enum', 'interface']:
-                results.append(node)
-        return results
+        self._ensure_search_index()
+        return list(self._types_by_name.get(type_name, ()))
     
     def print_function_details(self, func_name):
         """Print details for a specific function"""
+        sys.stdout.write(self.format_function_details(func_name))
+    
+    def format_function_details(self, func_name):
+        """Text printed by print_function_details, built as one string"""
         results = self.search_function(func_name)
         
         if not results:
-            print(f"\nNo function named '{func_name}' found.")
-            return
+            return f"\nNo function named '{func_name}' found.\n"
         
-        print(f"\n{'='*70}")
-        print(f"FUNCTION DETAILS: {func_name}")
-        print(f"{'='*70}")
+        out = [
+            f"\n{'='*70}",
+            f"FUNCTION DETAILS: {func_name}",
+            f"{'='*70}",
+        ]
         
         for node in results:
-            print(f"\n{node.full_path} [{node.language}]")
-            print(f"  Type: {node.node_type}")
-            print(f"  Lines: {node.start_line}-{node.end_line}")
-            if node.parent_class:
-                print(f"  Parent: {node.parent_class}")
-            if node.return_type:
-                print(f"  Return Type: {node.return_type}")
-            print(f"  Parameters: {node.parameters}")
-            print(f"  Calls: {len(node.calls)} functions")
-            for call in node.calls[:10]:
-                print(f"    -> {call}")
-            if len(node.calls) > 10:
-                print(f"    ... and {len(node.calls) - 10} more")
-            print(f"  Called by: {len(node.called_by)} functions")
-            for caller in node.called_by[:10]:
-                print(f"    <- {caller}")
-            if len(node.called_by) > 10:
-                print(f"    ... and {len(node.called_by) - 10} more")
+            # Fixed fields in one template; optional lines collapse to ''
+            parent = f"\n  Parent: {node.parent_class}" if node.parent_class else ''
+            return_type = f"\n  Return Type: {node.return_type}" if node.return_type else ''
+            out.append(
+                f"\n{node.full_path} [{node.language}]"
+                f"\n  Type: {node.node_type}"
+                f"\n  Lines: {node.start_line}-{node.end_line}"
+                f"{parent}{return_type}"
+                f"\n  Parameters: {list(node.parameters)}"
+            )
+            n_calls = len(node.calls)
+            out.append(f"  Calls: {n_calls} functions")
+            out.extend(f"    -> {call}" for call in islice(node.calls, 10))
+            if n_calls > 10:
+                out.append(f"    ... and {n_calls - 10} more")
+            n_called_by = len(node.called_by)
+            out.append(f"  Called by: {n_called_by} functions")
+            out.extend(f"    <- {caller}" for caller in islice(node.called_by, 10))
+            if n_called_by > 10:
+                out.append(f"    ... and {n_called_by - 10} more")
+        
+        out.append('')
+        return '\n'.join(out)
     
     def print_type_details(self, type_name):
         """Print details for a specific class, enum, or interface"""
+        sys.stdout.write(self.format_type_details(type_name))
+    
+    def format_type_details(self, type_name):
+        """Text printed by print_type_details, built as one string"""
         results = self.search_type(type_name)
         
         if not results:
-            print(f"\nNo type named '{type_name}' found.")
-            return
+            return f"\nNo type named '{type_name}' found.\n"
         
+        out = []
         for type_node in results:
-            methods = [n for n in self.nodes if n.parent_class == type_name and n.node_type == 'method']
+            methods = self._methods_by_class.get(type_name, [])
             
-            print(f"\n{'='*70}")
-            print(f"{type_node.node_type.upper()} DETAILS: {type_name} [{type_node.language}]")
-            print(f"{'='*70}")
+            out.append(f"\n{'='*70}")
+            out.append(f"{type_node.node_type.upper()} DETAILS: {type_name} [{type_node.language}]")
+            out.append(f"{'='*70}")
             
-            print(f"\nLocation: {type_node.full_path}")
-            print(f"Lines: {type_node.start_line}-{type_node.end_line}")
-            print(f"Total Methods: {len(methods)}")
+            out.append(f"\nLocation: {type_node.full_path}")
+            out.append(f"Lines: {type_node.start_line}-{type_node.end_line}")
+            out.append(f"Total Methods: {len(methods)}")
             
             if methods:
-                print(f"\nMethods:")
-                for method in sorted(methods, key=lambda m: m.start_line):
-                    params_str = ', '.join(method.parameters) if method.parameters else ''
+                out.append(f"\nMethods:")
+                for method in methods:
+                    params_str = ', '.join(method.parameters)
                     return_type_str = f" -> {method.return_type}" if method.return_type else ""
-                    print(f"  • {method.name}({params_str}){return_type_str}")
-                    print(f"      Line {method.start_line} | Calls: {len(method.calls)} | Called by: {len(method.called_by)}")
+                    out.append(f"  • {method.name}({params_str}){return_type_str}")
+                    out.append(f"      Line {method.start_line} | Calls: {len(method.calls)} | Called by: {len(method.called_by)}")
             
             if methods:
-                print(f"\nMost Called Methods:")
-                sorted_methods = sorted(methods, key=lambda m: len(m.called_by), reverse=True)[:5]
-                for method in sorted_methods:
-                    if method.called_by:
-                        print(f"  • {method.name}: called {len(method.called_by)} times")
-                        for caller in method.called_by[:3]:
-                            print(f"      <- {caller}")
-                        if len(method.called_by) > 3:
-                            print(f"      ... and {len(method.called_by) - 3} more")
+                out.append(f"\nMost Called Methods:")
+                for method in self._most_called_by_class[type_name]:
+                    n_called_by = len(method.called_by)
+                    if n_called_by:
+                        out.append(f"  • {method.name}: called {n_called_by} times")
+                        out.extend(f"      <- {caller}" for caller in islice(method.called_by, 3))
+                        if n_called_by > 3:
+                            out.append(f"      ... and {n_called_by - 3} more")
+        
+        out.append('')
+        return '\n'.join(out)
     
     def print_all_types(self):
         """Print all classes, enums, and interfaces"""
-        types = [n for n in self.nodes if n.node_type in ['class', 'enum', 'interface']]
+        self._ensure_search_index()
+        methods_by_class = self._methods_by_class
         
         print("\n" + "="*70)
         print("ALL TYPES (Classes, Enums, Interfaces)")
         print("="*70)
         
         types_by_file = defaultdict(list)
-        for node in types:
+        for node in self._types:
             types_by_file[node.filepath].append(node)
         
         for filepath in sorted(types_by_file.keys()):
             print(f"\n{filepath}:")
             for node in sorted(types_by_file[filepath], key=lambda n: n.start_line):
-                method_count = len([n for n in self.nodes if n.parent_class == node.name])
+                # Only methods carry a parent_class
+                method_count = len(methods_by_class.get(node.name, ()))
                 type_label = f"[{node.node_type}]"
                 print(f"  • {node.name} {type_label:12} [{node.start_line}] - {method_count} methods")
 
 
 if __name__ == "__main__":
+    # Piped or redirected reports go out in large blocks rather than per line
+    if not sys.stdout.isatty():
+        sys.stdout.flush()
+        sys.stdout = open(
+            sys.stdout.fileno(), 'w',
+            buffering=io.DEFAULT_BUFFER_SIZE * 8,
+            encoding=sys.stdout.encoding,
+            errors=sys.stdout.errors,
+            closefd=False
+        )
+    
     scanner = MultiLanguageScanner()
     
     # repo path
     repo_path = '/Users/siva/sandbox/spring-boot'
     
-    scanner.scan_repository(repo_path)
-    scanner.print_summary()
-    
-    # New methods:
-    # scanner.print_type_details('KafkaProperties')  # Works for class, enum, or interface
-    # scanner.print_all_types()  # Show all classes, enums, interfaces
+    try:
+        scanner.scan_repository(repo_path)
+        scanner.print_summary()
+        
+        # New methods:
+        # scanner.print_type_details('KafkaProperties')  # Works for class, enum, or interface
+        # scanner.print_all_types()  # Show all classes, enums, interfaces
+    finally:
+        sys.stdout.flush()
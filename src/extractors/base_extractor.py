@@ -1,17 +1,95 @@
 """
 Base extractor class for language-specific code extractors
 """
+import sys
 from abc import ABC, abstractmethod
 
+try:
+    from tree_sitter import Query, QueryCursor
+except ImportError as e:
+    # QueryCursor was added in py-tree-sitter 0.25
+    raise ImportError("Please upgrade tree-sitter: pip install 'tree-sitter>=0.25'") from e
+
+
+# Distinct identifier spellings remembered across files before starting over
+TEXT_CACHE_MAX = 100000
+
 
 class BaseExtractor(ABC):
     """
     Abstract base class for language-specific extractors
     """
 
-    def __init__(self):
+    # Tree-sitter query for this language's call sites; find_calls matches it
+    # inside libtree-sitter instead of walking every node of a body in Python
+    CALL_QUERY: str
+
+    def __init__(self, language):
+        """
+        Args:
+            language: tree_sitter.Language the extractor's trees are parsed with
+        """
         self.nodes = []
         self.node_map = {}
+        self._text_cache = {}
+        call_query = getattr(self, 'CALL_QUERY', None)
+        if not call_query:
+            raise TypeError(f"{type(self).__name__} must define CALL_QUERY")
+        self._call_cursor = QueryCursor(Query(language, call_query))
+        self._kind_ids = {}
+        for kind_id in range(language.node_kind_count):
+            self._kind_ids.setdefault(language.node_kind_for_id(kind_id), set()).add(kind_id)
+
+    def _kinds(self, node_type):
+        """
+        Every kind_id the grammar spells as node_type
+
+        Args:
+            node_type: Node type name, e.g. 'function_definition'
+
+        Returns:
+            frozenset of ints; aliased symbols share a name but not an id,
+            so extract() tests node.kind_id membership instead of node.type
+        """
+        return frozenset(self._kind_ids.get(node_type, ()))
+
+    def _text(self, source_code, node):
+        """
+        Source text of a node, decoded once per spelling and interned
+
+        Args:
+            source_code: Source code bytes the node was parsed from
+            node: Tree-sitter node
+
+        Returns:
+            The node's text as a str
+        """
+        # Names like self/this and common callees repeat across the whole
+        # repository; keyed on the raw bytes, each spelling is decoded once
+        raw = source_code[node.start_byte:node.end_byte]
+        cache = self._text_cache
+        text = cache.get(raw)
+        if text is None:
+            if len(cache) >= TEXT_CACHE_MAX:
+                cache.clear()
+            text = cache[raw] = sys.intern(raw.decode())
+        return text
+
+    def _call_matches(self, func_node):
+        """
+        Call-site captures under a node, in the order a pre-order walk visits them
+
+        Args:
+            func_node: Tree-sitter node to search
+
+        Returns:
+            List of {capture name: [nodes]} dicts
+        """
+        # The cursor reports a match when it completes, which puts a call
+        # nested in another call's callee first; restore document order
+        matches = [captures for _, captures in self._call_cursor.matches(func_node)]
+        matches.sort(key=lambda m: (m['call'][0].start_byte, -m['call'][0].end_byte))
+        return matches
 
     @abstractmethod
     def extract(self, root_node, source_code, filepath):
@@ -40,6 +118,7 @@ class BaseExtractor(ABC):
             filepath: Relative file path
 
         Returns:
-            List of qualified call paths
+            List of qualified call paths, interned so repeated targets share
+            one string with each other and with the callee's full_path
         """
         pass
@@ -1,6 +1,8 @@
 """
 C-specific code extractor
 """
+import sys
+
 from src.extractors.base_extractor import BaseExtractor
 from src.models.semantic_node import SemanticNode
 
@@ -8,18 +10,28 @@ from src.models.semantic_node import SemanticNode
 class CExtractor(BaseExtractor):
     """Extract semantic nodes from C code"""
 
+    CALL_QUERY = """
+        (call_expression function: (identifier) @id) @call
+    """
+
     def extract(self, root_node, source_code, filepath):
         """Extract nodes from C code"""
 
-        def walk(node):
-            if node.type == 'function_definition':
+        function_kinds = self._kinds('function_definition')
+
+        stack = [root_node]
+        while stack:
+            node = stack.pop()
+            kind = node.kind_id
+
+            if kind in function_kinds:
                 declarator = node.child_by_field_name('declarator')
                 if not declarator:
-                    return
+                    continue
 
                 func_name = self._get_function_name(declarator, source_code)
                 if not func_name:
-                    return
+                    continue
 
                 func_node = SemanticNode(
                     name=func_name,
@@ -31,14 +43,14 @@ class CExtractor(BaseExtractor):
                 )
 
                 func_node.qualified_name = func_name
-                func_node.full_path = f"{filepath}::{func_name}"
+                func_node.full_path = sys.intern(f"{filepath}::{func_name}")
 
                 params = self._get_parameters(declarator, source_code)
                 func_node.parameters = params
 
                 type_node = node.child_by_field_name('type')
                 if type_node:
-                    return_type = source_code[type_node.start_byte:type_node.end_byte].decode()
+                    return_type = self._text(source_code, type_node)
                     func_node.return_type = return_type
 
                 func_node.calls = self.find_calls(node, source_code, None, filepath)
@@ -46,10 +58,8 @@ class CExtractor(BaseExtractor):
                 self.nodes.append(func_node)
                 self.node_map[func_node.full_path] = func_node
 
-            for child in node.children:
-                walk(child)
+            stack.extend(reversed(node.children))
 
-        walk(root_node)
         return self.nodes
 
     def _get_function_name(self, declarator, source_code):
@@ -57,9 +67,9 @@ class CExtractor(BaseExtractor):
         if declarator.type == 'function_declarator':
             inner = declarator.child_by_field_name('declarator')
             if inner and inner.type == 'identifier':
-                return source_code[inner.start_byte:inner.end_byte].decode()
+                return self._text(source_code, inner)
         elif declarator.type == 'identifier':
-            return source_code[declarator.start_byte:declarator.end_byte].decode()
+            return self._text(source_code, declarator)
         return None
 
     def _get_parameters(self, declarator, source_code):
@@ -72,24 +82,18 @@ class CExtractor(BaseExtractor):
                     if child.type == 'parameter_declaration':
                         decl = child.child_by_field_name('declarator')
                         if decl and decl.type == 'identifier':
-                            param = source_code[decl.start_byte:decl.end_byte].decode()
+                            param = self._text(source_code, decl)
                             params.append(param)
-        return params
+        return tuple(params)
 
     def find_calls(self, func_node, source_code, context, filepath):
         """Find function calls in C"""
         calls = []
 
-        def walk(node):
-            if node.type == 'call_expression':
-                func = node.child_by_field_name('function')
-                if func and func.type == 'identifier':
-                    func_name = source_code[func.start_byte:func.end_byte].decode()
-                    qualified = f"{filepath}::{func_name}"
-                    calls.append(qualified)
-
-            for child in node.children:
-                walk(child)
+        for match in self._call_matches(func_node):
+            func = match['id'][0]
+            func_name = self._text(source_code, func)
+            qualified = f"{filepath}::{func_name}"
+            calls.append(sys.intern(qualified))
 
-        walk(func_node)
         return calls
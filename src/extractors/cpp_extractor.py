@@ -1,6 +1,8 @@
 """
 C++ specific code extractor
 """
+import sys
+
 from src.extractors.base_extractor import BaseExtractor
 from src.models.semantic_node import SemanticNode
 
@@ -8,16 +10,30 @@ from src.models.semantic_node import SemanticNode
 class CppExtractor(BaseExtractor):
     """Extract semantic nodes from C++ code"""
 
+    CALL_QUERY = """
+        (call_expression function: [
+            (identifier) @id
+            (field_expression argument: _ @obj field: _ @field)
+        ]) @call
+    """
+
     def extract(self, root_node, source_code, filepath):
         """Extract nodes from C++ code"""
 
-        def walk(node, parent_class=None, namespace=None):
-            if node.type == 'class_specifier':
+        class_kinds = self._kinds('class_specifier')
+        function_kinds = self._kinds('function_definition')
+
+        stack = [(root_node, None)]
+        while stack:
+            node, parent_class = stack.pop()
+            kind = node.kind_id
+
+            if kind in class_kinds:
                 name_node = node.child_by_field_name('name')
                 if not name_node:
-                    return
+                    continue
 
-                class_name = source_code[name_node.start_byte:name_node.end_byte].decode()
+                class_name = self._text(source_code, name_node)
 
                 class_node = SemanticNode(
                     name=class_name,
@@ -35,17 +51,16 @@ class CppExtractor(BaseExtractor):
 
                 body = node.child_by_field_name('body')
                 if body:
-                    for child in body.children:
-                        walk(child, parent_class=class_name, namespace=namespace)
+                    stack.extend((child, class_name) for child in reversed(body.children))
 
-            elif node.type == 'function_definition':
+            elif kind in function_kinds:
                 declarator = node.child_by_field_name('declarator')
                 if not declarator:
-                    return
+                    continue
 
                 func_name = self._get_function_name(declarator, source_code)
                 if not func_name:
-                    return
+                    continue
 
                 func_node = SemanticNode(
                     name=func_name,
@@ -59,17 +74,17 @@ class CppExtractor(BaseExtractor):
                 if parent_class:
                     func_node.parent_class = parent_class
                     func_node.qualified_name = f"{parent_class}.{func_name}"
-                    func_node.full_path = f"{filepath}::{parent_class}.{func_name}"
+                    func_node.full_path = sys.intern(f"{filepath}::{parent_class}.{func_name}")
                 else:
                     func_node.qualified_name = func_name
-                    func_node.full_path = f"{filepath}::{func_name}"
+                    func_node.full_path = sys.intern(f"{filepath}::{func_name}")
 
                 params = self._get_parameters(declarator, source_code)
                 func_node.parameters = params
 
                 type_node = node.child_by_field_name('type')
                 if type_node:
-                    return_type = source_code[type_node.start_byte:type_node.end_byte].decode()
+                    return_type = self._text(source_code, type_node)
                     func_node.return_type = return_type
 
                 func_node.calls = self.find_calls(node, source_code, parent_class, filepath)
@@ -78,10 +93,8 @@ class CppExtractor(BaseExtractor):
                 self.node_map[func_node.full_path] = func_node
 
             else:
-                for child in node.children:
-                    walk(child, parent_class=parent_class, namespace=namespace)
+                stack.extend((child, parent_class) for child in reversed(node.children))
 
-        walk(root_node)
         return self.nodes
 
     def _get_function_name(self, declarator, source_code):
@@ -90,11 +103,11 @@ class CppExtractor(BaseExtractor):
             inner = declarator.child_by_field_name('declarator')
             if inner:
                 if inner.type == 'identifier':
-                    return source_code[inner.start_byte:inner.end_byte].decode()
+                    return self._text(source_code, inner)
                 elif inner.type == 'field_identifier':
-                    return source_code[inner.start_byte:inner.end_byte].decode()
+                    return self._text(source_code, inner)
         elif declarator.type == 'identifier':
-            return source_code[declarator.start_byte:declarator.end_byte].decode()
+            return self._text(source_code, declarator)
         return None
 
     def _get_parameters(self, declarator, source_code):
@@ -108,40 +121,33 @@ class CppExtractor(BaseExtractor):
                         decl = child.child_by_field_name('declarator')
                         if decl:
                             if decl.type == 'identifier':
-                                param = source_code[decl.start_byte:decl.end_byte].decode()
+                                param = self._text(source_code, decl)
                                 params.append(param)
-        return params
+        return tuple(params)
 
     def find_calls(self, func_node, source_code, parent_class, filepath):
         """Find function calls in C++"""
         calls = []
 
-        def walk(node):
-            if node.type == 'call_expression':
-                func = node.child_by_field_name('function')
-                if func:
-                    if func.type == 'identifier':
-                        func_name = source_code[func.start_byte:func.end_byte].decode()
-                        if parent_class:
-                            qualified = f"{filepath}::{parent_class}.{func_name}"
-                        else:
-                            qualified = f"{filepath}::{func_name}"
-                        calls.append(qualified)
-                    elif func.type == 'field_expression':
-                        field = func.child_by_field_name('field')
-                        if field:
-                            method_name = source_code[field.start_byte:field.end_byte].decode()
-                            obj = func.child_by_field_name('argument')
-                            if obj:
-                                obj_name = source_code[obj.start_byte:obj.end_byte].decode()
-                                if obj_name == 'this' and parent_class:
-                                    qualified = f"{filepath}::{parent_class}.{method_name}"
-                                else:
-                                    qualified = f"{filepath}::{obj_name}.{method_name}"
-                                calls.append(qualified)
-
-            for child in node.children:
-                walk(child)
-
-        walk(func_node)
+        for match in self._call_matches(func_node):
+            if 'id' in match:
+                func = match['id'][0]
+                func_name = self._text(source_code, func)
+                if parent_class:
+                    qualified = f"{filepath}::{parent_class}.{func_name}"
+                else:
+                    qualified = f"{filepath}::{func_name}"
+                calls.append(sys.intern(qualified))
+                continue
+
+            field = match['field'][0]
+            method_name = self._text(source_code, field)
+            obj = match['obj'][0]
+            obj_name = self._text(source_code, obj)
+            if obj_name == 'this' and parent_class:
+                qualified = f"{filepath}::{parent_class}.{method_name}"
+            else:
+                qualified = f"{filepath}::{obj_name}.{method_name}"
+            calls.append(sys.intern(qualified))
+
         return calls
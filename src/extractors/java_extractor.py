@@ -1,6 +1,8 @@
 """
 Java-specific code extractor (with enum and interface support)
 """
+import sys
+
 from src.extractors.base_extractor import BaseExtractor
 from src.models.semantic_node import SemanticNode
 
@@ -8,17 +10,30 @@ from src.models.semantic_node import SemanticNode
 class JavaExtractor(BaseExtractor):
     """Extract semantic nodes from Java code - WITH ENUM AND INTERFACE SUPPORT"""
 
+    CALL_QUERY = """
+        (method_invocation object: _ ? @obj name: _ @name) @call
+    """
+
     def extract(self, root_node, source_code, filepath):
         """Extract nodes from Java code"""
 
-        def walk(node, parent_class=None):
+        class_kinds = self._kinds('class_declaration')
+        enum_kinds = self._kinds('enum_declaration')
+        interface_kinds = self._kinds('interface_declaration')
+        method_kinds = self._kinds('method_declaration')
+
+        stack = [(root_node, None)]
+        while stack:
+            node, parent_class = stack.pop()
+            kind = node.kind_id
+
             # Java class: class_declaration
-            if node.type == 'class_declaration':
+            if kind in class_kinds:
                 name_node = node.child_by_field_name('name')
                 if not name_node:
-                    return
+                    continue
 
-                class_name = source_code[name_node.start_byte:name_node.end_byte].decode()
+                class_name = self._text(source_code, name_node)
 
                 class_node = SemanticNode(
                     name=class_name,
@@ -37,16 +52,15 @@ class JavaExtractor(BaseExtractor):
                 # Walk class body
                 body = node.child_by_field_name('body')
                 if body:
-                    for child in body.children:
-                        walk(child, parent_class=class_name)
+                    stack.extend((child, class_name) for child in reversed(body.children))
 
             # Java enum: enum_declaration
-            elif node.type == 'enum_declaration':
+            elif kind in enum_kinds:
                 name_node = node.child_by_field_name('name')
                 if not name_node:
-                    return
+                    continue
 
-                enum_name = source_code[name_node.start_byte:name_node.end_byte].decode()
+                enum_name = self._text(source_code, name_node)
 
                 enum_node = SemanticNode(
                     name=enum_name,
@@ -65,16 +79,15 @@ class JavaExtractor(BaseExtractor):
                 # Walk enum body (enums can have methods too!)
                 body = node.child_by_field_name('body')
                 if body:
-                    for child in body.children:
-                        walk(child, parent_class=enum_name)
+                    stack.extend((child, enum_name) for child in reversed(body.children))
 
             # Java interface: interface_declaration
-            elif node.type == 'interface_declaration':
+            elif kind in interface_kinds:
                 name_node = node.child_by_field_name('name')
                 if not name_node:
-                    return
+                    continue
 
-                interface_name = source_code[name_node.start_byte:name_node.end_byte].decode()
+                interface_name = self._text(source_code, name_node)
 
                 interface_node = SemanticNode(
                     name=interface_name,
@@ -93,16 +106,15 @@ class JavaExtractor(BaseExtractor):
                 # Walk interface body
                 body = node.child_by_field_name('body')
                 if body:
-                    for child in body.children:
-                        walk(child, parent_class=interface_name)
+                    stack.extend((child, interface_name) for child in reversed(body.children))
 
             # Java method: method_declaration
-            elif node.type == 'method_declaration':
+            elif kind in method_kinds:
                 name_node = node.child_by_field_name('name')
                 if not name_node:
-                    return
+                    continue
 
-                method_name = source_code[name_node.start_byte:name_node.end_byte].decode()
+                method_name = self._text(source_code, name_node)
 
                 method_node = SemanticNode(
                     name=method_name,
@@ -116,25 +128,27 @@ class JavaExtractor(BaseExtractor):
                 if parent_class:
                     method_node.parent_class = parent_class
                     method_node.qualified_name = f"{parent_class}.{method_name}"
-                    method_node.full_path = f"{filepath}::{parent_class}.{method_name}"
+                    method_node.full_path = sys.intern(f"{filepath}::{parent_class}.{method_name}")
                 else:
                     method_node.qualified_name = method_name
-                    method_node.full_path = f"{filepath}::{method_name}"
+                    method_node.full_path = sys.intern(f"{filepath}::{method_name}")
 
                 # Extract parameters
                 params_node = node.child_by_field_name('parameters')
                 if params_node:
+                    params = []
                     for child in params_node.children:
                         if child.type == 'formal_parameter':
                             param_name_node = child.child_by_field_name('name')
                             if param_name_node:
-                                param = source_code[param_name_node.start_byte:param_name_node.end_byte].decode()
-                                method_node.parameters.append(param)
+                                param = self._text(source_code, param_name_node)
+                                params.append(param)
+                    method_node.parameters = tuple(params)
 
                 # Extract return type
                 type_node = node.child_by_field_name('type')
                 if type_node:
-                    return_type = source_code[type_node.start_byte:type_node.end_byte].decode()
+                    return_type = self._text(source_code, type_node)
                     method_node.return_type = return_type
 
                 # Find calls
@@ -144,41 +158,33 @@ class JavaExtractor(BaseExtractor):
                 self.node_map[method_node.full_path] = method_node
 
             else:
-                for child in node.children:
-                    walk(child, parent_class=parent_class)
+                stack.extend((child, parent_class) for child in reversed(node.children))
 
-        walk(root_node)
         return self.nodes
 
     def find_calls(self, func_node, source_code, parent_class, filepath):
         """Find method calls in Java"""
         calls = []
 
-        def walk(node):
-            if node.type == 'method_invocation':
-                name_node = node.child_by_field_name('name')
-                if name_node:
-                    method_name = source_code[name_node.start_byte:name_node.end_byte].decode()
-
-                    object_node = node.child_by_field_name('object')
-                    if object_node:
-                        obj_name = source_code[object_node.start_byte:object_node.end_byte].decode()
-                        if obj_name == 'this' and parent_class:
-                            qualified = f"{filepath}::{parent_class}.{method_name}"
-                        elif obj_name == parent_class:
-                            qualified = f"{filepath}::{parent_class}.{method_name}"
-                        else:
-                            qualified = f"{filepath}::{obj_name}.{method_name}"
-                    else:
-                        if parent_class:
-                            qualified = f"{filepath}::{parent_class}.{method_name}"
-                        else:
-                            qualified = f"{filepath}::{method_name}"
-
-                    calls.append(qualified)
-
-            for child in node.children:
-                walk(child)
-
-        walk(func_node)
+        for match in self._call_matches(func_node):
+            name_node = match['name'][0]
+            method_name = self._text(source_code, name_node)
+
+            if 'obj' in match:
+                object_node = match['obj'][0]
+                obj_name = self._text(source_code, object_node)
+                if obj_name == 'this' and parent_class:
+                    qualified = f"{filepath}::{parent_class}.{method_name}"
+                elif obj_name == parent_class:
+                    qualified = f"{filepath}::{parent_class}.{method_name}"
+                else:
+                    qualified = f"{filepath}::{obj_name}.{method_name}"
+            else:
+                if parent_class:
+                    qualified = f"{filepath}::{parent_class}.{method_name}"
+                else:
+                    qualified = f"{filepath}::{method_name}"
+
+            calls.append(sys.intern(qualified))
+
         return calls
@@ -1,6 +1,8 @@
 """
 Python-specific code extractor
 """
+import sys
+
 from src.extractors.base_extractor import BaseExtractor
 from src.models.semantic_node import SemanticNode
 
@@ -8,16 +10,33 @@ from src.models.semantic_node import SemanticNode
 class PythonExtractor(BaseExtractor):
     """Extract semantic nodes from Python code"""
 
+    CALL_QUERY = """
+        (call function: [
+            (identifier) @id
+            (attribute object: _ @obj attribute: _ @attr)
+        ]) @call
+    """
+
     def extract(self, root_node, source_code, filepath):
         """Extract nodes from Python code"""
 
-        def walk(node, parent_class=None):
-            if node.type == 'class_definition':
+        class_kinds = self._kinds('class_definition')
+        function_kinds = self._kinds('function_definition')
+
+        # Explicit stack instead of recursion: no Python frame per tree node
+        # and no recursion limit on deeply nested sources. Children are pushed
+        # in reverse so nodes still come out in source order.
+        stack = [(root_node, None)]
+        while stack:
+            node, parent_class = stack.pop()
+            kind = node.kind_id
+
+            if kind in class_kinds:
                 name_node = node.child_by_field_name('name')
                 if not name_node:
-                    return
+                    continue
 
-                class_name = source_code[name_node.start_byte:name_node.end_byte].decode()
+                class_name = self._text(source_code, name_node)
 
                 class_node = SemanticNode(
                     name=class_name,
@@ -33,15 +52,14 @@ class PythonExtractor(BaseExtractor):
                 self.nodes.append(class_node)
                 self.node_map[class_node.full_path] = class_node
 
-                for child in node.children:
-                    walk(child, parent_class=class_name)
+                stack.extend((child, class_name) for child in reversed(node.children))
 
-            elif node.type == 'function_definition':
+            elif kind in function_kinds:
                 name_node = node.child_by_field_name('name')
                 if not name_node:
-                    return
+                    continue
 
-                func_name = source_code[name_node.start_byte:name_node.end_byte].decode()
+                func_name = self._text(source_code, name_node)
 
                 func_node = SemanticNode(
                     name=func_name,
@@ -55,18 +73,20 @@ class PythonExtractor(BaseExtractor):
                 if parent_class:
                     func_node.parent_class = parent_class
                     func_node.qualified_name = f"{parent_class}.{func_name}"
-                    func_node.full_path = f"{filepath}::{parent_class}.{func_name}"
+                    func_node.full_path = sys.intern(f"{filepath}::{parent_class}.{func_name}")
                 else:
                     func_node.qualified_name = func_name
-                    func_node.full_path = f"{filepath}::{func_name}"
+                    func_node.full_path = sys.intern(f"{filepath}::{func_name}")
 
                 # Extract parameters
                 params_node = node.child_by_field_name('parameters')
                 if params_node:
+                    params = []
                     for child in params_node.children:
                         if child.type == 'identifier':
-                            param = source_code[child.start_byte:child.end_byte].decode()
-                            func_node.parameters.append(param)
+                            param = self._text(source_code, child)
+                            params.append(param)
+                    func_node.parameters = tuple(params)
 
                 # Find calls
                 func_node.calls = self.find_calls(node, source_code, parent_class, filepath)
@@ -75,44 +95,33 @@ class PythonExtractor(BaseExtractor):
                 self.node_map[func_node.full_path] = func_node
 
             else:
-                for child in node.children:
-                    walk(child, parent_class=parent_class)
+                stack.extend((child, parent_class) for child in reversed(node.children))
 
-        walk(root_node)
         return self.nodes
 
     def find_calls(self, func_node, source_code, parent_class, filepath):
         """Find function calls in Python"""
         calls = []
 
-        def walk(node):
-            if node.type == 'call':
-                func_name_node = node.child_by_field_name('function')
-
-                if func_name_node:
-                    if func_name_node.type == 'identifier':
-                        called_name = source_code[func_name_node.start_byte:func_name_node.end_byte].decode()
-                        qualified = f"{filepath}::{called_name}"
-                        calls.append(qualified)
-
-                    elif func_name_node.type == 'attribute':
-                        obj_node = func_name_node.child_by_field_name('object')
-                        attr_node = func_name_node.child_by_field_name('attribute')
-
-                        if obj_node and attr_node:
-                            obj_name = source_code[obj_node.start_byte:obj_node.end_byte].decode()
-                            method_name = source_code[attr_node.start_byte:attr_node.end_byte].decode()
-
-                            if obj_name == 'self' and parent_class:
-                                qualified = f"{filepath}::{parent_class}.{method_name}"
-                            elif obj_name == parent_class:
-                                qualified = f"{filepath}::{parent_class}.{method_name}"
-                            else:
-                                qualified = f"{filepath}::{obj_name}.{method_name}"
-                            calls.append(qualified)
-
-            for child in node.children:
-                walk(child)
+        for match in self._call_matches(func_node):
+            if 'id' in match:
+                id_node = match['id'][0]
+                called_name = self._text(source_code, id_node)
+                qualified = f"{filepath}::{called_name}"
+                calls.append(sys.intern(qualified))
+                continue
+
+            obj_node = match['obj'][0]
+            attr_node = match['attr'][0]
+            obj_name = self._text(source_code, obj_node)
+            method_name = self._text(source_code, attr_node)
+
+            if obj_name == 'self' and parent_class:
+                qualified = f"{filepath}::{parent_class}.{method_name}"
+            elif obj_name == parent_class:
+                qualified = f"{filepath}::{parent_class}.{method_name}"
+            else:
+                qualified = f"{filepath}::{obj_name}.{method_name}"
+            calls.append(sys.intern(qualified))
 
-        walk(func_node)
         return calls
@@ -2,26 +2,93 @@
 GitHub Pull Request fetcher
 Fetches PR metadata and diff content from GitHub API
 """
+import hashlib
+import json
+import os
 import re
 import requests
 from typing import Dict, Optional
 
+# Responses are cached here and revalidated with ETag / Last-Modified
+DEFAULT_CACHE_DIR = ".pr_cache"
+
 
 class PRFetcher:
     """Fetch PR information from GitHub"""
 
-    def __init__(self, github_token: Optional[str] = None):
+    def __init__(self, github_token: Optional[str] = None, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
         """
         Initialize PR fetcher
 
         Args:
             github_token: Optional GitHub personal access token for private repos
+            cache_dir: Directory for cached responses (None disables caching)
         """
         self.github_token = github_token
+        self.cache_dir = cache_dir
         self.headers = {}
         if github_token:
             self.headers['Authorization'] = f'token {github_token}'
 
+        # One session keeps the connection to GitHub open across requests
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+
+    def _get(self, url: str) -> str:
+        """
+        GET a URL, reusing the cached body when GitHub answers 304 Not Modified
+
+        Conditional requests that return 304 don't count against GitHub's
+        rate limit, and skip re-downloading large diffs.
+
+        Args:
+            url: URL to fetch
+
+        Returns:
+            Response body text
+        """
+        if self.cache_dir is None:
+            response = self.session.get(url)
+            response.raise_for_status()
+            return response.text
+
+        # Key on the token too, so cached private content stays per-credential
+        key = hashlib.sha1(f"{self.github_token or ''}\n{url}".encode()).hexdigest()
+        cache_path = os.path.join(self.cache_dir, f"{key}.json")
+
+        cached = None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        conditional = {}
+        if cached:
+            if cached.get('etag'):
+                conditional['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                conditional['If-Modified-Since'] = cached['last_modified']
+
+        response = self.session.get(url, headers=conditional)
+        if response.status_code == 304 and cached:
+            return cached['body']
+        response.raise_for_status()
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'etag': etag, 'last_modified': last_modified, 'body': response.text}, f)
+                os.replace(tmp_path, cache_path)
+            except OSError:
+                pass
+
+        return response.text
+
     def parse_pr_url(self, pr_url: str) -> Dict[str, str]:
         """
         Parse GitHub PR URL to extract owner, repo, and PR number
@@ -57,10 +124,7 @@ class PRFetcher:
         parsed = self.parse_pr_url(pr_url)
         api_url = f"https://api.github.com/repos/{parsed['owner']}/{parsed['repo']}/pulls/{parsed['pr_number']}"
 
-        response = requests.get(api_url, headers=self.headers)
-        response.raise_for_status()
-
-        return response.json()
+        return json.loads(self._get(api_url))
 
     def fetch_pr_diff(self, pr_url: str) -> str:
         """
@@ -75,10 +139,7 @@ class PRFetcher:
         parsed = self.parse_pr_url(pr_url)
         diff_url = f"https://patch-diff.githubusercontent.com/raw/{parsed['owner']}/{parsed['repo']}/pull/{parsed['pr_number']}.diff"
 
-        response = requests.get(diff_url, headers=self.headers)
-        response.raise_for_status()
-
-        return response.text
+        return self._get(diff_url)
 
     def fetch_pr_files(self, pr_url: str) -> list:
         """
@@ -93,7 +154,4 @@ class PRFetcher:
         parsed = self.parse_pr_url(pr_url)
         api_url = f"https://api.github.com/repos/{parsed['owner']}/{parsed['repo']}/pulls/{parsed['pr_number']}/files"
 
-        response = requests.get(api_url, headers=self.headers)
-        response.raise_for_status()
-
-        return response.json()
+        return json.loads(self._get(api_url))
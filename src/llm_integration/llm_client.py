@@ -3,8 +3,48 @@ Configurable LLM client supporting multiple providers
 Uses LangChain for better integration
 """
 from dataclasses import dataclass
-from typing import Optional, Dict
+from typing import Optional, Dict, Callable
 import os
+import threading
+
+try:
+    from langchain_core.messages import HumanMessage, SystemMessage
+except ImportError:
+    HumanMessage = SystemMessage = None
+
+
+# The system message is identical for every call, so it is built once
+_SYSTEM_PROMPT = "You are an expert code reviewer."
+_system_message = SystemMessage(content=_SYSTEM_PROMPT) if SystemMessage is not None else None
+
+
+# One pooled HTTP client shared by every LLMClient, so repeated calls reuse
+# open (keep-alive) connections instead of a new TCP/TLS handshake each time
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def _shared_http_client():
+    """Shared httpx.Client (HTTP/2 when the h2 package is installed), or None without httpx"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                try:
+                    import httpx
+                except ImportError:
+                    return None
+                try:
+                    import h2  # noqa: F401
+                    http2 = True
+                except ImportError:
+                    http2 = False
+                _http_client = httpx.Client(
+                    http2=http2,
+                    timeout=60.0,
+                    limits=httpx.Limits(max_keepalive_connections=8)
+                )
+    return _http_client
 
 
 @dataclass
@@ -65,7 +105,8 @@ class LLMClient:
                 max_completion_tokens=self.config.max_tokens,
                 top_p=self.config.top_p,
                 reasoning_effort=self.config.reasoning_effort,
-                stop=None
+                stop=None,
+                http_client=_shared_http_client()
             )
         except ImportError:
             raise ImportError("Please install langchain-groq: pip install langchain-groq")
@@ -82,7 +123,8 @@ class LLMClient:
                 model=self.config.model,
                 api_key=api_key,
                 temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
+                max_tokens=self.config.max_tokens,
+                http_client=_shared_http_client()
             )
         except ImportError:
             raise ImportError("Please install langchain-openai: pip install langchain-openai")
@@ -156,16 +198,36 @@ Please provide a thorough code review covering:
 Provide specific, actionable feedback.
 """
 
-    def _call_llm(self, prompt: str) -> str:
-        """Call LLM using LangChain's invoke method"""
+    def _call_llm(
+        self,
+        prompt: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        raise_errors: bool = False
+    ) -> str:
+        """
+        Call LLM using LangChain's invoke method
+
+        With on_token, the response is streamed instead and each chunk of
+        text is passed to on_token as it arrives; the full text is returned.
+        A failed call returns an error message in place of the response,
+        unless raise_errors is set or the call streams (part of the answer
+        may already have reached on_token); the exception is raised then.
+        """
         try:
-            from langchain_core.messages import HumanMessage, SystemMessage
+            if HumanMessage is None:
+                raise ImportError("Please install langchain-core: pip install langchain-core")
 
             # Build messages
-            messages = [
-                SystemMessage(content="You are an expert code reviewer."),
-                HumanMessage(content=prompt)
-            ]
+            messages = [_system_message, HumanMessage(content=prompt)]
+
+            if on_token is not None:
+                parts = []
+                for chunk in self.client.stream(messages):
+                    text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                    if text:
+                        on_token(text)
+                        parts.append(text)
+                return ''.join(parts)
 
             # Invoke the LLM
             response = self.client.invoke(messages)
@@ -179,15 +241,26 @@ Provide specific, actionable feedback.
                 return str(response)
 
         except Exception as e:
+            if on_token is not None or raise_errors:
+                raise
             return f"Error calling LLM ({self.config.provider}): {e}"
 
-    def answer_question(self, question: str, context: str) -> str:
+    def answer_question(
+        self,
+        question: str,
+        context: str,
+        on_token: Optional[Callable[[str], None]] = None,
+        raise_errors: bool = False
+    ) -> str:
         """
         Answer a question about the codebase using context
 
         Args:
             question: User's question
             context: Retrieved code context
+            on_token: Optional callback receiving the answer as it streams in
+            raise_errors: Raise provider errors instead of returning an
+                error message as the answer
 
         Returns:
             LLM answer
@@ -202,4 +275,4 @@ Provide specific, actionable feedback.
 
 Please provide a clear, detailed answer based on the code context provided.
 """
-        return self._call_llm(prompt)
+        return self._call_llm(prompt, on_token, raise_errors)
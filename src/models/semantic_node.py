@@ -7,6 +7,14 @@ class SemanticNode:
     Represents a semantic code entity (class, function, method, enum, interface)
     """
 
+    # Fixed attribute set: no per-instance __dict__, so nodes are about half
+    # the size and attribute reads in the search/report scans are cheaper
+    __slots__ = (
+        'name', 'node_type', 'start_line', 'end_line', 'filepath', 'language',
+        'parent_class', 'qualified_name', 'full_path', 'calls', 'called_by',
+        'parameters', 'return_type',
+    )
+
     def __init__(self, name, node_type, start_line, end_line, filepath=None, language=None):
         self.name = name
         self.node_type = node_type  # 'class', 'enum', 'interface', 'function', 'method'
@@ -18,8 +26,10 @@ class SemanticNode:
         self.qualified_name = None
         self.full_path = None
         self.calls = []
-        self.called_by = []
-        self.parameters = []
+        # Shared empty defaults: most nodes are never called and many take no
+        # parameters, so only nodes that need them get their own container
+        self.called_by = ()
+        self.parameters = ()
         self.return_type = None
 
     def __repr__(self):
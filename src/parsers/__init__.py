@@ -1,6 +1,7 @@
 """
 Repository parsing and scanning
 """
+from .parse_cache import ParseCache
 from .repository_scanner import RepositoryScanner
 
-__all__ = ['RepositoryScanner']
+__all__ = ['ParseCache', 'RepositoryScanner']
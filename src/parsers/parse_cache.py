@@ -0,0 +1,124 @@
+"""
+On-disk cache of extracted nodes, keyed by file content
+"""
+import hashlib
+import os
+import pickle
+
+
+# Bump when extractor output changes so older entries stop matching
+PARSE_CACHE_VERSION = 1
+
+# Entries kept after pruning; unchanged files refresh their entry's mtime
+PARSE_CACHE_MAX_FILES = 50000
+
+
+class ParseCache:
+    """
+    Per-file SemanticNode lists stored as one pickle per content hash
+
+    A changed file hashes to a new key, so stale entries are never read;
+    they age out through prune(). Writes go through a temp file and an
+    atomic rename, so concurrent scanners (or worker processes) never see
+    a partial entry.
+    """
+
+    def __init__(self, cache_dir):
+        """
+        Args:
+            cache_dir: Directory holding the cache entries (created on first write)
+        """
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(source_code, rel_path, language):
+        """
+        Cache key for one file
+
+        Args:
+            source_code: File contents as bytes
+            rel_path: Path relative to the repository root
+            language: Language identifier
+
+        Returns:
+            Hex digest; the path is included because node ids embed it
+        """
+        h = hashlib.blake2b(digest_size=16)
+        h.update(f"{PARSE_CACHE_VERSION}\0{language}\0{rel_path}\0".encode())
+        h.update(source_code)
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """
+        Nodes previously stored under key
+
+        Args:
+            key: Value from ParseCache.key()
+
+        Returns:
+            List of SemanticNode objects, or None if the file has to be parsed
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                nodes = pickle.load(f)
+        except Exception:
+            # Missing, truncated or stale entry; parsing again overwrites it
+            return None
+
+        try:
+            # Mark as recently used for prune()
+            os.utime(path)
+        except OSError:
+            pass
+        return nodes
+
+    def put(self, key, nodes):
+        """
+        Store a file's extracted nodes (best effort)
+
+        Args:
+            key: Value from ParseCache.key()
+            nodes: List of SemanticNode objects from that file only
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(nodes, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def prune(self, max_files=PARSE_CACHE_MAX_FILES):
+        """
+        Drop the least recently used entries beyond max_files
+
+        Args:
+            max_files: Number of entries to keep
+        """
+        try:
+            with os.scandir(self.cache_dir) as it:
+                entries = [
+                    (entry.stat().st_mtime, entry.path)
+                    for entry in it if entry.name.endswith('.pkl')
+                ]
+        except OSError:
+            return
+
+        if len(entries) <= max_files:
+            return
+
+        entries.sort()
+        for _, path in entries[:len(entries) - max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
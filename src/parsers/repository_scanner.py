@@ -2,13 +2,22 @@
 Multi-language repository scanner
 """
 import os
-from collections import defaultdict
+import multiprocessing
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
 from tree_sitter import Language, Parser
 import tree_sitter_python as tspython
 import tree_sitter_java as tsjava
 import tree_sitter_c as tsc
 import tree_sitter_cpp as tscpp
 
+from src.parsers.parse_cache import ParseCache
 from src.utils.language_detector import LanguageDetector
 from src.extractors.python_extractor import PythonExtractor
 from src.extractors.java_extractor import JavaExtractor
@@ -16,6 +25,59 @@ from src.extractors.c_extractor import CExtractor
 from src.extractors.cpp_extractor import CppExtractor
 
 
+# Below this many files, worker start-up costs more than parallel parsing saves
+PARALLEL_MIN_FILES = 64
+
+# Files handed to a worker at a time; the total isn't known while streaming
+STREAM_CHUNKSIZE = 16
+
+# Scan progress is reported every this many files or seconds, not per file
+PROGRESS_EVERY_FILES = 500
+PROGRESS_INTERVAL = 0.5
+
+# Scanner owned by each worker process (tree-sitter parsers can't be pickled)
+_worker_scanner = None
+
+
+def _worker_context():
+    """
+    Start method for scan worker processes
+
+    A forked child of a multi-threaded process can deadlock, and scans do
+    run next to other threads (repo_rag builds the tree inside
+    asyncio.to_thread). When other threads are alive, workers come from
+    forkserver (spawn where that is unavailable); otherwise the platform
+    default is kept, so single-threaded scripts without a __main__ guard
+    still work.
+    """
+    if threading.active_count() == 1:
+        return multiprocessing.get_context()
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def _init_scan_worker(scanner_cls, ignore_patterns, cache_dir):
+    """Build the per-process scanner; its parser-loading messages are discarded"""
+    global _worker_scanner
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            _worker_scanner = scanner_cls(ignore_patterns, cache_dir=cache_dir)
+        finally:
+            sys.stdout = stdout
+
+
+def _scan_file_in_worker(task):
+    """Parse one file in a worker; returns (nodes, error message or None)"""
+    filepath, rel_path, language = task
+    try:
+        return _worker_scanner.extract_file(filepath, rel_path, language), None
+    except Exception as e:
+        return [], str(e)
+
+
 class RepositoryScanner:
     """Multi-language repository scanner supporting Python, Java, C, C++"""
 
@@ -26,17 +88,34 @@ class RepositoryScanner:
         '*.egg-info', '.eggs', 'migrations', 'tests', 'test',
     }
 
-    def __init__(self, ignore_patterns=None):
+    # Statistics bucket for each node type
+    STAT_KEYS = {
+        'class': 'classes', 'enum': 'enums', 'interface': 'interfaces',
+        'function': 'functions', 'method': 'methods',
+    }
+
+    def __init__(self, ignore_patterns=None, max_workers=None, cache_dir=None):
+        """
+        Args:
+            ignore_patterns: Extra path patterns to skip, on top of DEFAULT_IGNORE
+            max_workers: Parser processes for large scans (default: CPU count)
+            cache_dir: Directory for the per-file parse cache (None disables it)
+        """
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.parse_cache = ParseCache(cache_dir) if cache_dir else None
         self.parsers = {}
         self.extractors = {}
         self.nodes = []
         self.node_map = {}
         self.file_count = 0
         self.error_count = 0
+        self._progress_time = 0.0
 
         self.ignore_patterns = self.DEFAULT_IGNORE.copy()
         if ignore_patterns:
             self.ignore_patterns.update(ignore_patterns)
+        self._compile_ignore_patterns()
 
         self._setup_parsers()
 
@@ -45,7 +124,7 @@ class RepositoryScanner:
         try:
             py_lang = Language(tspython.language())
             self.parsers['python'] = Parser(py_lang)
-            self.extractors['python'] = PythonExtractor()
+            self.extractors['python'] = PythonExtractor(py_lang)
             print("✓ Python parser loaded")
         except Exception as e:
             print(f"✗ Python parser failed: {e}")
@@ -53,7 +132,7 @@ class RepositoryScanner:
         try:
             java_lang = Language(tsjava.language())
             self.parsers['java'] = Parser(java_lang)
-            self.extractors['java'] = JavaExtractor()
+            self.extractors['java'] = JavaExtractor(java_lang)
             print("✓ Java parser loaded")
         except Exception as e:
             print(f"✗ Java parser failed: {e}")
@@ -61,7 +140,7 @@ class RepositoryScanner:
         try:
             c_lang = Language(tsc.language())
             self.parsers['c'] = Parser(c_lang)
-            self.extractors['c'] = CExtractor()
+            self.extractors['c'] = CExtractor(c_lang)
             print("✓ C parser loaded")
         except Exception as e:
             print(f"✗ C parser failed: {e}")
@@ -69,71 +148,214 @@ class RepositoryScanner:
         try:
             cpp_lang = Language(tscpp.language())
             self.parsers['cpp'] = Parser(cpp_lang)
-            self.extractors['cpp'] = CppExtractor()
+            self.extractors['cpp'] = CppExtractor(cpp_lang)
             print("✓ C++ parser loaded")
         except Exception as e:
             print(f"✗ C++ parser failed: {e}")
 
+    def _compile_ignore_patterns(self):
+        """Fold the ignore patterns into one regex (one C-level scan per path)"""
+        self._ignore_re = re.compile('|'.join(map(re.escape, sorted(self.ignore_patterns))))
+        # Without separators in any pattern, a match can't span a '/', so an
+        # entry of an already-cleared directory only needs its name checked
+        self._ignore_by_name = not any(
+            '/' in p or os.sep in p for p in self.ignore_patterns
+        )
+
     def should_ignore(self, path):
         """Check if path should be ignored"""
         basename = os.path.basename(path)
 
-        if basename in self.ignore_patterns:
+        if basename in self.ignore_patterns or self._ignore_re.search(path):
             return True
 
-        for pattern in self.ignore_patterns:
-            if pattern in path:
-                return True
+        return basename.startswith('.') and basename != '.'
 
-        if basename.startswith('.') and basename != '.':
+    def _name_ignored(self, name):
+        """should_ignore() for an entry whose parent directory path was already cleared"""
+        if name in self.ignore_patterns or self._ignore_re.search(name):
             return True
 
-        return False
+        return name.startswith('.') and name != '.'
 
     def scan_repository(self, repo_path):
         """Scan entire repository"""
         print(f"\nScanning repository: {repo_path}\n")
 
-        for root, dirs, files in os.walk(repo_path):
-            dirs[:] = [d for d in dirs if not self.should_ignore(os.path.join(root, d))]
+        files = self._iter_files(repo_path)
+        # Walk only far enough to tell whether a worker pool pays off
+        tasks = list(islice(files, PARALLEL_MIN_FILES))
+        self._progress_time = time.monotonic()
+
+        workers = self.max_workers or os.cpu_count() or 1
+        done = 0
+        if workers > 1 and len(tasks) >= PARALLEL_MIN_FILES:
+            # Files parse independently; results come back in walk order, so
+            # nodes and node_map end up exactly as in a serial scan
+            def stream():
+                yield from tasks[:PARALLEL_MIN_FILES]
+                for task in files:
+                    tasks.append(task)
+                    yield task
+
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=_worker_context(),
+                    initializer=_init_scan_worker,
+                    initargs=(type(self), self.ignore_patterns - self.DEFAULT_IGNORE, self.cache_dir)
+                ) as pool:
+                    # map() submits each file as the walk yields it, so the
+                    # workers parse (and read) the first files while later
+                    # directories are still being listed
+                    results = pool.map(_scan_file_in_worker, stream(), chunksize=STREAM_CHUNKSIZE)
+                    for nodes, error in results:
+                        if error is None:
+                            self._add_nodes(nodes)
+                            self.file_count += 1
+                        else:
+                            print(f"    ✗ Error in {tasks[done][1]}: {error}")
+                            self.error_count += 1
+                        done += 1
+                        self._report_progress(done, len(tasks))
+            except (OSError, BrokenProcessPool) as e:
+                print(f"  ⚠ Parallel scan unavailable ({e}); continuing serially")
+
+        # Whatever the pool didn't get to, walked or not
+        tasks.extend(files)
+        for filepath, rel_path, language in tasks[done:]:
+            try:
+                self.scan_file(filepath, rel_path, language)
+                self.file_count += 1
+            except Exception as e:
+                print(f"    ✗ Error in {rel_path}: {e}")
+                self.error_count += 1
+            done += 1
+            self._report_progress(done, len(tasks))
+
+        if self.parse_cache:
+            self.parse_cache.prune()
 
-            for filename in files:
-                filepath = os.path.join(root, filename)
+        self._print_scan_summary()
+        return self.nodes
+
+    def _iter_files(self, repo_path):
+        """
+        Yield the files to parse as the walk finds them
+
+        Directories are read with os.scandir, whose entries answer is_dir()
+        from the directory listing itself instead of a stat per entry. The
+        explicit stack visits them in the same top-down order as os.walk.
+
+        Args:
+            repo_path: Repository root
+
+        Yields:
+            (filepath, rel_path, language) tuples in walk order
+        """
+        # Name-only checks are only safe while should_ignore is this class's
+        name_checks = (
+            self._ignore_by_name
+            and type(self).should_ignore is RepositoryScanner.should_ignore
+        )
+
+        # The root itself is never checked, so its entries get full-path checks
+        stack = [(repo_path, False)]
+        while stack:
+            dirpath, cleared = stack.pop()
+            try:
+                with os.scandir(dirpath) as it:
+                    entries = list(it)
+            except OSError:
+                # os.walk skips unreadable directories too
+                continue
+
+            ignored = self._name_ignored if cleared else None
+            rel_dir = os.path.relpath(dirpath, repo_path)
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if ignored is not None:
+                    skip = ignored(entry.name)
+                else:
+                    skip = self.should_ignore(entry.path)
+
+                if is_dir:
+                    # Like os.walk, symlinked directories are not followed
+                    if not skip and not entry.is_symlink():
+                        subdirs.append(entry.path)
+                    continue
 
-                if self.should_ignore(filepath):
+                if skip:
                     continue
 
-                language = LanguageDetector.detect(filepath)
+                language = LanguageDetector.detect_name(entry.name)
                 if not language or language not in self.parsers:
                     continue
 
-                rel_path = os.path.relpath(filepath, repo_path)
+                rel_path = entry.name if rel_dir == '.' else os.path.join(rel_dir, entry.name)
+                yield entry.path, rel_path, language
 
-                try:
-                    print(f"  [{language:6}] Parsing: {rel_path}")
-                    self.scan_file(filepath, rel_path, language)
-                    self.file_count += 1
-                except Exception as e:
-                    print(f"    ✗ Error: {e}")
-                    self.error_count += 1
+            stack.extend((subdir, name_checks) for subdir in reversed(subdirs))
 
-        self._print_scan_summary()
-        return self.nodes
+    def _report_progress(self, done, total):
+        """Print a progress line every PROGRESS_EVERY_FILES files or PROGRESS_INTERVAL seconds"""
+        now = time.monotonic()
+        if (done < total and done % PROGRESS_EVERY_FILES
+                and now - self._progress_time < PROGRESS_INTERVAL):
+            return
+        self._progress_time = now
+        print(f"  Parsed {done}/{total} files", flush=done == total)
 
     def scan_file(self, filepath, rel_path, language):
         """Scan a single file"""
+        self._add_nodes(self.extract_file(filepath, rel_path, language))
+
+    def extract_file(self, filepath, rel_path, language):
+        """
+        Parse one file and extract its nodes
+
+        Args:
+            filepath: Path to read
+            rel_path: Path relative to the repository root
+            language: Language identifier
+
+        Returns:
+            List of SemanticNode objects found in this file only
+        """
         with open(filepath, 'rb') as f:
             source_code = f.read()
 
+        cache_key = None
+        if self.parse_cache:
+            cache_key = ParseCache.key(source_code, rel_path, language)
+            nodes = self.parse_cache.get(cache_key)
+            if nodes is not None:
+                return nodes
+
         tree = self.parsers[language].parse(source_code)
         extractor = self.extractors[language]
 
-        # Extract nodes
-        extracted_nodes = extractor.extract(tree.root_node, source_code, rel_path)
+        # Extractors accumulate into their own lists; start each file empty
+        # so only this file's nodes come back
+        extractor.nodes = []
+        extractor.node_map = {}
+        nodes = extractor.extract(tree.root_node, source_code, rel_path)
 
-        # Merge nodes and node_map
-        self.nodes.extend(extracted_nodes)
-        self.node_map.update(extractor.node_map)
+        if cache_key:
+            self.parse_cache.put(cache_key, nodes)
+        return nodes
+
+    def _add_nodes(self, nodes):
+        """Merge one file's nodes into nodes and node_map"""
+        self.nodes.extend(nodes)
+        node_map = self.node_map
+        for node in nodes:
+            node_map[node.full_path] = node
 
     def _print_scan_summary(self):
         """Print scan summary"""
@@ -142,9 +364,7 @@ class RepositoryScanner:
         print(f"✗ Errors: {self.error_count} files")
 
         # Enhanced statistics
-        type_counts = defaultdict(int)
-        for node in self.nodes:
-            type_counts[node.node_type] += 1
+        type_counts = Counter(node.node_type for node in self.nodes)
 
         print(f"✓ Total classes: {type_counts['class']}")
         print(f"✓ Total enums: {type_counts['enum']}")
@@ -155,23 +375,31 @@ class RepositoryScanner:
 
     def get_statistics(self):
         """Get repository statistics"""
-        stats = {
+        def empty_counts():
+            return {'classes': 0, 'enums': 0, 'interfaces': 0, 'functions': 0, 'methods': 0}
+
+        by_language = defaultdict(empty_counts)
+        files = defaultdict(empty_counts)
+        totals = dict.fromkeys(self.STAT_KEYS.values(), 0)
+
+        # Count each (language, file, type) combination in one pass, then
+        # fold the far smaller set of distinct keys into the tables
+        counts = Counter((node.language, node.filepath, node.node_type) for node in self.nodes)
+        for (lang, filepath, node_type), count in counts.items():
+            key = self.STAT_KEYS.get(node_type)
+            if key is None:
+                continue
+            totals[key] += count
+            by_language[lang][key] += count
+            files[filepath][key] += count
+
+        return {
             'total_files': self.file_count,
-            'total_classes': len([n for n in self.nodes if n.node_type == 'class']),
-            'total_enums': len([n for n in self.nodes if n.node_type == 'enum']),
-            'total_interfaces': len([n for n in self.nodes if n.node_type == 'interface']),
-            'total_functions': len([n for n in self.nodes if n.node_type == 'function']),
-            'total_methods': len([n for n in self.nodes if n.node_type == 'method']),
-            'by_language': defaultdict(lambda: {'classes': 0, 'enums': 0, 'interfaces': 0, 'functions': 0, 'methods': 0}),
-            'files': defaultdict(lambda: {'classes': 0, 'enums': 0, 'interfaces': 0, 'functions': 0, 'methods': 0})
+            'total_classes': totals['classes'],
+            'total_enums': totals['enums'],
+            'total_interfaces': totals['interfaces'],
+            'total_functions': totals['functions'],
+            'total_methods': totals['methods'],
+            'by_language': by_language,
+            'files': files
         }
-
-        for node in self.nodes:
-            lang = node.language
-            node_type = node.node_type
-
-            if node_type in ['class', 'enum', 'interface', 'function', 'method']:
-                stats['by_language'][lang][f"{node_type}s" if node_type != 'class' else 'classes'] += 1
-                stats['files'][node.filepath][f"{node_type}s" if node_type != 'class' else 'classes'] += 1
-
-        return stats
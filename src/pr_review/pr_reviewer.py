@@ -5,6 +5,7 @@ Implements README Step 3: Dynamic Context Retrieval
 from typing import Optional, List, Dict
 from src.parsers.repository_scanner import RepositoryScanner
 from src.utils.call_graph_builder import CallGraphBuilder
+from src.utils.node_search import NodeSearch
 from src.github.pr_fetcher import PRFetcher
 from src.diff_parser.diff_parser import DiffParser
 from src.context_retrieval.context_builder import ContextBuilder
@@ -49,6 +50,7 @@ class PRReviewer:
         self.scanner = None
         self.nodes = None
         self.node_map = None
+        self.node_search = None
         self.context_builder = None
 
     def scan_repository(self):
@@ -62,6 +64,7 @@ class PRReviewer:
         CallGraphBuilder.build_call_graph(self.nodes, self.scanner.node_map)
 
         self.node_map = self.scanner.node_map
+        self.node_search = NodeSearch(self.nodes)
         self.context_builder = ContextBuilder(
             self.nodes,
             self.node_map,
@@ -236,8 +239,7 @@ class PRReviewer:
         # Build context
         if about_function:
             # Find the function
-            from src.utils.node_search import NodeSearch
-            results = NodeSearch.search_function(self.nodes, about_function)
+            results = self.node_search.functions_named(about_function)
 
             if not results:
                 return f"Could not find function '{about_function}' in the codebase."
@@ -1,6 +1,7 @@
 """
 Call graph builder for building dependency relationships
 """
+from collections import defaultdict
 
 
 class CallGraphBuilder:
@@ -20,10 +21,17 @@ class CallGraphBuilder:
         """
         print("Building call graph...")
 
+        # Group callers by target first, then do one node_map lookup per
+        # distinct target instead of two per call site
+        callers_by_path = defaultdict(list)
         for node in nodes:
+            full_path = node.full_path
             for called_path in node.calls:
-                if called_path in node_map:
-                    target_node = node_map[called_path]
-                    target_node.called_by.append(node.full_path)
+                callers_by_path[called_path].append(full_path)
+
+        for called_path, callers in callers_by_path.items():
+            target_node = node_map.get(called_path)
+            if target_node is not None:
+                target_node.called_by = callers
 
         return nodes
@@ -33,3 +33,23 @@ class LanguageDetector:
         """
         _, ext = os.path.splitext(filepath)
         return LanguageDetector.LANGUAGE_MAP.get(ext.lower())
+
+    @staticmethod
+    def detect_name(name):
+        """
+        detect() for a bare file name, without the os.path.splitext call
+
+        Args:
+            name: File name with no directory part
+
+        Returns:
+            Language identifier (str) or None if not supported
+        """
+        # A leading dot does not start an extension
+        dot = name.rfind('.')
+        if dot <= 0:
+            return None
+        ext = name[dot:]
+        language_map = LanguageDetector.LANGUAGE_MAP
+        # Keys are lowercase; only mixed-case extensions pay for lower()
+        return language_map.get(ext) or language_map.get(ext.lower())
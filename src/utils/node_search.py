@@ -1,13 +1,68 @@
 """
 Node search and query utilities
 """
+from collections import defaultdict
+from typing import Dict, List
 
 
 class NodeSearch:
-    """Search and query semantic nodes"""
+    """
+    Search and query semantic nodes
 
-    @staticmethod
-    def search_function(nodes, func_name):
+    The search_* class methods scan the given list on every call. For
+    repeated queries against one repository, build a NodeSearch(nodes)
+    and use functions_named()/types_named(), which are dict lookups.
+    """
+
+    FUNCTION_KINDS = frozenset({'function', 'method'})
+    TYPE_KINDS = frozenset({'class', 'enum', 'interface'})
+
+    def __init__(self, nodes: List):
+        """
+        Index nodes by name
+
+        The index reflects nodes as they are now; build a new NodeSearch
+        after the list changes.
+
+        Args:
+            nodes: List of SemanticNode objects
+        """
+        functions_by_name: Dict[str, List] = defaultdict(list)
+        types_by_name: Dict[str, List] = defaultdict(list)
+        for node in nodes:
+            if node.node_type in self.FUNCTION_KINDS:
+                functions_by_name[node.name].append(node)
+            elif node.node_type in self.TYPE_KINDS:
+                types_by_name[node.name].append(node)
+        self._functions_by_name: Dict[str, List] = dict(functions_by_name)
+        self._types_by_name: Dict[str, List] = dict(types_by_name)
+
+    def functions_named(self, func_name):
+        """
+        Indexed search_function()
+
+        Args:
+            func_name: Function name to search for
+
+        Returns:
+            List of matching SemanticNode objects
+        """
+        return list(self._functions_by_name.get(func_name, ()))
+
+    def types_named(self, type_name):
+        """
+        Indexed search_type()
+
+        Args:
+            type_name: Type name to search for
+
+        Returns:
+            List of matching SemanticNode objects
+        """
+        return list(self._types_by_name.get(type_name, ()))
+
+    @classmethod
+    def search_function(cls, nodes, func_name):
         """
         Search for functions by name
 
@@ -18,14 +73,13 @@ class NodeSearch:
         Returns:
             List of matching SemanticNode objects
         """
-        results = []
-        for node in nodes:
-            if node.name == func_name and node.node_type in ['function', 'method']:
-                results.append(node)
-        return results
+        return [
+            node for node in nodes
+            if node.name == func_name and node.node_type in cls.FUNCTION_KINDS
+        ]
 
-    @staticmethod
-    def search_type(nodes, type_name):
+    @classmethod
+    def search_type(cls, nodes, type_name):
         """
         Search for classes, enums, or interfaces by name
 
@@ -36,8 +90,7 @@ class NodeSearch:
         Returns:
             List of matching SemanticNode objects
         """
-        results = []
-        for node in nodes:
-            if node.name == type_name and node.node_type in ['class', 'enum', 'interface']:
-                results.append(node)
-        return results
+        return [
+            node for node in nodes
+            if node.name == type_name and node.node_type in cls.TYPE_KINDS
+        ]
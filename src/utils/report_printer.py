@@ -1,7 +1,10 @@
 """
 Report printing utilities for semantic analysis
 """
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+
+TYPE_KINDS = frozenset({'class', 'enum', 'interface'})
 
 
 class ReportPrinter:
@@ -113,7 +116,13 @@ class ReportPrinter:
     @staticmethod
     def print_all_types(nodes):
         """Print all classes, enums, and interfaces"""
-        types = [n for n in nodes if n.node_type in ['class', 'enum', 'interface']]
+        types = []
+        method_counts = Counter()
+        for n in nodes:
+            if n.node_type in TYPE_KINDS:
+                types.append(n)
+            if n.parent_class:
+                method_counts[n.parent_class] += 1
 
         print("\n" + "="*70)
         print("ALL TYPES (Classes, Enums, Interfaces)")
@@ -126,6 +135,6 @@ class ReportPrinter:
         for filepath in sorted(types_by_file.keys()):
             print(f"\n{filepath}:")
             for node in sorted(types_by_file[filepath], key=lambda n: n.start_line):
-                method_count = len([n for n in nodes if n.parent_class == node.name])
+                method_count = method_counts[node.name]
                 type_label = f"[{node.node_type}]"
                 print(f"  • {node.name} {type_label:12} [{node.start_line}] - {method_count} methods")
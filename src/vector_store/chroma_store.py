@@ -9,12 +9,76 @@ ChromaDB advantages:
 - Easy to use
 """
 import os
+import uuid
 from typing import List, Dict, Optional, Any
 import chromadb
 from chromadb.config import Settings
 from chromadb.utils import embedding_functions
 
 
+# Chroma's own files in a persist directory; other files kept there (the
+# semantic tree and parse caches) are never read by Chroma
+_CHROMA_DB_FILE = 'chroma.sqlite3'
+
+
+def _fadvise_willneed(path: str) -> bool:
+    """Queue readahead for one file; False if it could not be opened"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+
+
+def _prefetch_directory(directory: str) -> int:
+    """
+    Ask the kernel to start reading Chroma's database files into the page cache
+
+    Uses posix_fadvise(WILLNEED), which queues asynchronous readahead and
+    returns immediately, so Chroma's SQLite and HNSW segment files are
+    already (partly) cached by the time they are first read. Only
+    chroma.sqlite3 and the segment directories (named by UUID) are
+    prefetched. No-op where posix_fadvise is unavailable (e.g. macOS,
+    Windows).
+
+    Args:
+        directory: Chroma persist directory
+
+    Returns:
+        Number of files prefetched
+    """
+    if not hasattr(os, 'posix_fadvise') or not os.path.isdir(directory):
+        return 0
+
+    count = 0
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return 0
+
+    for entry in entries:
+        if entry.name == _CHROMA_DB_FILE:
+            count += _fadvise_willneed(entry.path)
+            continue
+        if not entry.is_dir(follow_symlinks=False):
+            continue
+        try:
+            uuid.UUID(entry.name)
+        except ValueError:
+            continue
+        for root, _, files in os.walk(entry.path):
+            for name in files:
+                count += _fadvise_willneed(os.path.join(root, name))
+    return count
+
+
 class ChromaVectorStore:
     """
     Vector store using ChromaDB for code embeddings
@@ -29,7 +93,10 @@ class ChromaVectorStore:
     def __init__(
         self,
         persist_directory: str = "./chroma_db",
-        collection_name: str = "code_embeddings"
+        collection_name: str = "code_embeddings",
+        prefetch: bool = True,
+        host: Optional[str] = None,
+        port: int = 8000
     ):
         """
         Initialize ChromaDB vector store
@@ -37,16 +104,35 @@ class ChromaVectorStore:
         Args:
             persist_directory: Where to store the database
             collection_name: Name of the collection (usually repo name)
+            prefetch: Start reading the database files into the page cache
+                before opening them (speeds up cold starts on Linux)
+            host: Chroma server host; when set, connect to a running server
+                (`chroma run`) instead of opening persist_directory in-process
+            port: Chroma server port
         """
         self.persist_directory = persist_directory
         self.collection_name = collection_name
 
         # Initialize ChromaDB client
-        print(f"🔄 Initializing ChromaDB at {persist_directory}")
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(anonymized_telemetry=False)
-        )
+        if host:
+            # Server mode: queries run in the server process, so concurrent
+            # callers only wait on the socket, and the index need not fit
+            # in this process's memory
+            print(f"🔄 Connecting to ChromaDB server at {host}:{port}")
+            self.client = chromadb.HttpClient(
+                host=host,
+                port=port,
+                settings=Settings(anonymized_telemetry=False)
+            )
+        else:
+            if prefetch:
+                _prefetch_directory(persist_directory)
+
+            print(f"🔄 Initializing ChromaDB at {persist_directory}")
+            self.client = chromadb.PersistentClient(
+                path=persist_directory,
+                settings=Settings(anonymized_telemetry=False)
+            )
 
         # Create or get collection
         # Note: ChromaDB will use the default embedding function unless we provide embeddings
@@ -26,7 +26,9 @@ class RepositoryIndexer:
         self,
         repository_path: str,
         collection_name: Optional[str] = None,
-        persist_directory: str = "./chroma_db"
+        persist_directory: str = "./chroma_db",
+        chroma_host: Optional[str] = None,
+        chroma_port: int = 8000
     ):
         """
         Initialize repository indexer
@@ -35,6 +37,8 @@ class RepositoryIndexer:
             repository_path: Path to local repository
             collection_name: Name for the vector collection (default: repo name)
             persist_directory: Where to store ChromaDB data
+            chroma_host: Chroma server host (None = in-process database)
+            chroma_port: Chroma server port
         """
         self.repository_path = os.path.abspath(repository_path)
 
@@ -45,6 +49,8 @@ class RepositoryIndexer:
 
         self.collection_name = collection_name
         self.persist_directory = persist_directory
+        self.chroma_host = chroma_host
+        self.chroma_port = chroma_port
 
         # Initialize components (lazy loading)
         self.semantic_tree = None
@@ -83,7 +89,10 @@ class RepositoryIndexer:
 
         # Step 1: Build semantic tree
         print("\n📊 Step 1/4: Building semantic tree...")
-        scanner = MultiLanguageScanner()
+        # Shares the per-file parse cache with RepoRAG for the same collection
+        scanner = MultiLanguageScanner(
+            cache_dir=os.path.join(self.persist_directory, f"{self.collection_name}.parse_cache")
+        )
         nodes = scanner.scan_repository(self.repository_path)
         node_map = scanner.node_map
         self.semantic_tree = {'nodes': nodes, 'node_map': node_map}
@@ -144,7 +153,9 @@ class RepositoryIndexer:
         print(f"\n💾 Step 4/4: Storing in ChromaDB...")
         self.vector_store = ChromaVectorStore(
             persist_directory=self.persist_directory,
-            collection_name=self.collection_name
+            collection_name=self.collection_name,
+            host=self.chroma_host,
+            port=self.chroma_port
         )
 
         # Clear if force rebuild
@@ -209,7 +220,9 @@ class RepositoryIndexer:
             from src.vector_store import ChromaVectorStore
             self.vector_store = ChromaVectorStore(
                 persist_directory=self.persist_directory,
-                collection_name=self.collection_name
+                collection_name=self.collection_name,
+                host=self.chroma_host,
+                port=self.chroma_port
             )
 
         return self.vector_store.get_stats()
@@ -220,7 +233,9 @@ class RepositoryIndexer:
             from src.vector_store import ChromaVectorStore
             self.vector_store = ChromaVectorStore(
                 persist_directory=self.persist_directory,
-                collection_name=self.collection_name
+                collection_name=self.collection_name,
+                host=self.chroma_host,
+                port=self.chroma_port
             )
 
         self.vector_store.delete_collection()
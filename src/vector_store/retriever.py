@@ -6,8 +6,9 @@ This is the KEY component that makes RAG powerful:
 2. Semantic tree expands context with callers/callees
 3. Result: Rich, connected code context for LLM
 """
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, Callable
 import os
+import threading
 
 
 class HybridRetriever:
@@ -27,25 +28,50 @@ class HybridRetriever:
     def __init__(
         self,
         vector_store,
-        semantic_tree: Dict,
+        semantic_tree: Optional[Dict],
         repository_path: str,
-        embedding_generator
+        embedding_generator,
+        tree_provider: Optional[Callable[[], Dict]] = None
     ):
         """
         Initialize hybrid retriever
 
         Args:
             vector_store: ChromaVectorStore instance
-            semantic_tree: Dict with 'nodes' and 'node_map'
+            semantic_tree: Dict with 'nodes' and 'node_map', or None to
+                obtain it from tree_provider
             repository_path: Path to repository
             embedding_generator: EmbeddingGenerator instance
+            tree_provider: Called on the first semantic expansion to build
+                the tree, so vector-only retrieval never pays for it
         """
         self.vector_store = vector_store
-        self.nodes = semantic_tree['nodes']
-        self.node_map = semantic_tree['node_map']
         self.repository_path = repository_path
         self.embedding_generator = embedding_generator
 
+        self._semantic_tree = semantic_tree
+        self._tree_provider = tree_provider
+        self._tree_lock = threading.Lock()
+
+    @property
+    def semantic_tree(self) -> Dict:
+        """The semantic tree, built through tree_provider on first access"""
+        if self._semantic_tree is None:
+            with self._tree_lock:
+                if self._semantic_tree is None:
+                    if self._tree_provider is None:
+                        raise ValueError("HybridRetriever needs a semantic_tree or a tree_provider")
+                    self._semantic_tree = self._tree_provider()
+        return self._semantic_tree
+
+    @property
+    def nodes(self) -> List:
+        return self.semantic_tree['nodes']
+
+    @property
+    def node_map(self) -> Dict:
+        return self.semantic_tree['node_map']
+
     def retrieve(
         self,
         question: str,
@@ -53,7 +79,8 @@ class HybridRetriever:
         expand_context: bool = True,
         max_context_items: int = 15,
         language_filter: Optional[str] = None,
-        min_similarity: float = 0.25
+        min_similarity: float = 0.25,
+        question_embedding=None
     ) -> Dict:
         """
         Retrieve relevant code for a question
@@ -65,6 +92,7 @@ class HybridRetriever:
             max_context_items: Maximum total context items to return
             language_filter: Filter by language (e.g., "python")
             min_similarity: Minimum similarity score (0-1) to consider relevant
+            question_embedding: Precomputed embedding of question (computed if None)
 
         Returns:
             Dictionary with retrieved code and metadata
@@ -73,16 +101,13 @@ class HybridRetriever:
 
         # Step 1: Vector search
         print(f"   📊 Step 1: Vector search (top-{top_k})...")
-        vector_results = self._vector_search(question, top_k, language_filter)
+        vector_results = self._vector_search(
+            question, top_k, language_filter, question_embedding
+        )
 
         # Filter by minimum similarity (distance = 1 - similarity for cosine)
-        filtered_results = []
-        for result in vector_results:
-            similarity = 1 - result['distance']
-            if similarity >= min_similarity:
-                filtered_results.append(result)
-
-        vector_results = filtered_results
+        max_distance = 1 - min_similarity
+        vector_results = [r for r in vector_results if r['distance'] <= max_distance]
 
         if not vector_results:
             print("   ⚠️  No relevant results found (all below similarity threshold)!")
@@ -122,7 +147,8 @@ class HybridRetriever:
         self,
         question: str,
         top_k: int,
-        language_filter: Optional[str] = None
+        language_filter: Optional[str] = None,
+        question_embedding=None
     ) -> List[Dict]:
         """
         Perform vector similarity search
@@ -131,12 +157,14 @@ class HybridRetriever:
             question: User question
             top_k: Number of results
             language_filter: Optional language filter
+            question_embedding: Precomputed embedding of question
 
         Returns:
             List of result dictionaries
         """
-        # Generate embedding for question
-        question_embedding = self.embedding_generator.embed_single(question)
+        # Generate embedding for question unless the caller already has it
+        if question_embedding is None:
+            question_embedding = self.embedding_generator.embed_single(question)
 
         # Build metadata filter
         where_filter = None
@@ -151,18 +179,21 @@ class HybridRetriever:
         )
 
         # Convert to our format
-        result_list = []
-        if results['ids'] and len(results['ids']) > 0:
-            for i, result_id in enumerate(results['ids'][0]):
-                result_list.append({
-                    'id': result_id,
-                    'metadata': results['metadatas'][0][i],
-                    'distance': results['distances'][0][i],
-                    'source': 'vector_search',
-                    'rank': i + 1
-                })
-
-        return result_list
+        if not results['ids']:
+            return []
+
+        return [
+            {
+                'id': result_id,
+                'metadata': metadata,
+                'distance': distance,
+                'source': 'vector_search',
+                'rank': rank
+            }
+            for rank, (result_id, metadata, distance) in enumerate(
+                zip(results['ids'][0], results['metadatas'][0], results['distances'][0]), 1
+            )
+        ]
 
     def _expand_with_semantic_tree(
         self,
@@ -186,6 +217,7 @@ class HybridRetriever:
         """
         expanded = []
         seen_ids = set()
+        node_map = self.node_map
 
         # First, add all vector results (they're most relevant)
         for result in vector_results:
@@ -207,18 +239,18 @@ class HybridRetriever:
             filepath = result['metadata']['filepath']
             full_path = f"{filepath}::{node_id}"
 
-            if full_path not in self.node_map:
+            if full_path not in node_map:
                 continue
 
-            node = self.node_map[full_path]
+            node = node_map[full_path]
 
             # Add callers (breaking change risk)
             for caller_path in node.called_by[:2]:  # Top 2 callers
                 if len(expanded) >= max_items:
                     break
 
-                if caller_path in self.node_map and caller_path not in seen_ids:
-                    caller_node = self.node_map[caller_path]
+                if caller_path in node_map and caller_path not in seen_ids:
+                    caller_node = node_map[caller_path]
                     expanded.append({
                         'id': caller_path,
                         'metadata': {
@@ -239,8 +271,8 @@ class HybridRetriever:
                 if len(expanded) >= max_items:
                     break
 
-                if callee_path in self.node_map and callee_path not in seen_ids:
-                    callee_node = self.node_map[callee_path]
+                if callee_path in node_map and callee_path not in seen_ids:
+                    callee_node = node_map[callee_path]
                     expanded.append({
                         'id': callee_path,
                         'metadata': {